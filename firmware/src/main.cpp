@@ -194,7 +194,7 @@ void drawHeartEye(int cx, int cy);
 
 // ============== SETUP ==============
 void setup() {
-    Serial.begin(115200);
+    Serial.begin(921600);
     Serial.println("\n\n=============================");
     Serial.println("  Lumina Pro - Body Unit");
     Serial.println("=============================");
@@ -572,11 +572,16 @@ void handleUDP() {
             brainIP = udp.remoteIP();
             brainConnected = true;
             
-            String cmd = String(udpBuffer);
-            cmd.trim();
-            
-            Serial.printf("UDP from %s: %s\n", brainIP.toString().c_str(), cmd.c_str());
-            parseCommand(cmd);
+            // One datagram may carry several newline-separated commands
+            char* savePtr = nullptr;
+            for (char* line = strtok_r(udpBuffer, "\n", &savePtr); line; line = strtok_r(nullptr, "\n", &savePtr)) {
+                String cmd = String(line);
+                cmd.trim();
+                if (cmd.length() == 0) continue;
+                
+                Serial.printf("UDP from %s: %s\n", brainIP.toString().c_str(), cmd.c_str());
+                parseCommand(cmd);
+            }
         }
     }
 }
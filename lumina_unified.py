@@ -19,8 +19,12 @@ import os
 import sys
 import math
 import threading
+import queue
 import time
 import re
+import json
+import signal
+import argparse
 import warnings
 import sys
 import requests
@@ -59,6 +63,13 @@ except ImportError:
     SR_AVAILABLE = False
     print("⚠️ speech_recognition not installed. Wake word disabled.")
 
+try:
+    # Offline speech recognition for wake words (optional)
+    from vosk import Model as VoskModel, KaldiRecognizer
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
 try:
     import serial
     import serial.tools.list_ports
@@ -66,8 +77,22 @@ try:
 except ImportError:
     SERIAL_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    # libuv-based event loop - cheaper wakeups for the Live session's audio tasks
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False  # Default asyncio loop
+
 # Network imports for "Split Nervous System" architecture
 import socket
+import select
 import urllib.request
 import urllib.error
 
@@ -83,14 +108,36 @@ class Config:
     AUDIO_OUT_PORT = 5007   # Port to send audio TO ESP32 speaker
     CAM_IP = None  # ESP32-CAM IP (set to None for local webcam)
     CAM_PORT = 80           # HTTP port for camera stream
+    DEBUG_COMMANDS = False  # Log every datagram sent to the body
     
     # Serial (fallback if network not available)
-    BAUD_RATE = 115200
+    BAUD_RATE = 921600  # Must match Serial.begin() in firmware/src/main.cpp
+    
+    # Servo output runs on a fixed tick: the target is smoothed with an EMA and
+    # sent at most this often (unchanged angles are never resent)
+    SERVO_MAX_RATE_HZ = 30
+    SERVO_EMA_ALPHA = 0.3  # Weight of the newest target (1 = no smoothing)
     
     # Vision thresholds
     MIN_ASPECT_RATIO = 1.3
     OPENNESS_THRESHOLD = 0.85
     DEADZONE = 15  # Pixels from center before servo moves (prevents jitter)
+    INFERENCE_WIDTH = 320  # Frame width fed to MediaPipe (height keeps aspect ratio)
+    # MediaPipe Tasks hand model (hand_landmarker.task from the MediaPipe model page).
+    # If the file exists it runs in async LIVE_STREAM mode; otherwise the legacy
+    # mp.solutions.hands pipeline is used.
+    HAND_LANDMARKER_MODEL = "hand_landmarker.task"
+    # Legacy Hands model: 0 = lite (~2x faster), 1 = full. The straightness and
+    # aspect-ratio gates absorb the lite model's small loss in precision.
+    MODEL_COMPLEXITY = 0
+    # Strict detection, lenient tracking: once a hand is found, the landmark
+    # model keeps following it and the palm detector rarely has to rerun
+    MIN_DETECTION_CONFIDENCE = 0.9
+    MIN_TRACKING_CONFIDENCE = 0.5
+    TRACKING_FRAME_SKIP = 2  # While a hand is tracked, run MediaPipe on every Nth frame (1 = all)
+    # Resize/convert the inference frame via OpenCL (cv2.UMat) when a GPU is available.
+    # Off by default: for small frames the upload/download often costs more than it saves.
+    USE_OPENCL = False
     # Verticality thresholds for palm/nails detection
     VERTICALITY_RATIO = 1.5   # abs(dy) / (abs(dx)+eps) must exceed this to be considered vertical
     VERTICAL_DY = 0.02        # minimum absolute normalized dy to consider as up/down
@@ -106,7 +153,13 @@ class Config:
     # Center offset calibration (if camera not perfectly centered)
     PAN_CENTER = 90    # Servo position when looking straight ahead
     TILT_CENTER = 90   # Servo position when looking straight ahead
-    
+
+    # Vision pipeline - capture and inference run on their own threads
+    PIPELINE_QUEUE_SIZE = 2  # Results buffered for the main thread (oldest dropped when full)
+    RENDER_EVERY_N = 3       # Draw overlays + imshow on every Nth frame; servo control runs on all
+    STATIC_FRAME_THRESHOLD = 2  # Max 8x8 grayscale change for a hand-less frame to reuse the last result (-1 = off)
+    STATIC_FRAME_MAX_SKIP = 10  # Still run MediaPipe on at least every Nth reused frame
+
     # Gemini Live API  
     # Use the native audio model for best real-time performance
     LIVE_MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
@@ -130,6 +183,18 @@ class Config:
         "ආයුබෝවන් ලුමිනා", "හායි ලුමිනා", "ලුමිනා", "හායිලුමිනා"
     ]
     
+    # Wake word recognition: one language per request; the fallback is only
+    # tried when the primary language can't decode the phrase at all
+    WAKE_LANGUAGE = "en-US"
+    WAKE_FALLBACK_LANGUAGE = "si-LK"
+    # Path to a Vosk model directory: wake phrases are then recognized on-device
+    # instead of by Google Speech ("" = use Google; needs `pip install vosk`)
+    WAKE_VOSK_MODEL = ""
+    # What Vosk listens for: "lumina" isn't in its vocabularies, so these are
+    # in-vocabulary spellings that sound like the wake words. Vosk only ever
+    # outputs one of these (or nothing), and any of them counts as a wake word.
+    WAKE_VOSK_PHRASES = ["hey lou mina", "hi lou mina", "hello lou mina", "lou mina"]
+    
     # End conversation phrases
     END_PHRASES = [
         "goodbye lumina", "bye lumina", "stop lumina", "that's all",
@@ -197,6 +262,15 @@ class State(Enum):
     LIVE_CHAT = auto()      # Continuous live conversation
 
 
+# State indicator colors (BGR) for the on-screen status dot
+STATE_COLORS = {
+    State.IDLE: (128, 128, 128),
+    State.TRACKING: (0, 255, 0),
+    State.LISTENING: (255, 165, 0),
+    State.LIVE_CHAT: (0, 165, 255)
+}
+
+
 # ============== ROBOT CONTROLLER ==============
 class RobotController:
     """
@@ -206,6 +280,7 @@ class RobotController:
     def __init__(self):
         self.serial = None
         self.udp_socket = None
+        self._udp_connected = False  # set once the socket is connect()ed to the body
         self.body_ip = None
         self.body_port = Config.BODY_PORT
         self.connected = False
@@ -215,11 +290,22 @@ class RobotController:
         self.chat_mode = False  # Touch sensor state from body
         self.status_callback = None
         
-        # Servo rate limiting - prevent flooding commands
+        # Servo output - move() only records the target; _servo_loop sends it
         self._last_pan = 90
         self._last_tilt = 90
-        self._last_move_time = 0
-        self._move_interval = 0.02  # 20ms between move commands (faster tracking)
+        self._servo_target = None
+        self._servo_lock = threading.Lock()
+        self._servo_wake = threading.Event()  # Set by move(); the loop parks on it once settled
+        self._servo_running = False
+        self._servo_thread = None
+        
+        # Network I/O thread - owns the UDP socket once started
+        self._io_thread = None
+        self._io_running = False
+        
+        # Serial TX buffer - commands queued during a frame go out in one write()
+        self._tx_buf = bytearray()
+        self._tx_lock = threading.Lock()
         
         # Try network first, then serial
         if self.use_network:
@@ -227,34 +313,150 @@ class RobotController:
         
         if not self.connected and SERIAL_AVAILABLE:
             self._auto_connect_serial()
+        
+        if self.udp_socket and self.body_ip:
+            self._start_io_thread()
+        
+        self._servo_running = True
+        self._servo_thread = threading.Thread(target=self._servo_loop, name="lumina-servo", daemon=True)
+        self._servo_thread.start()
     
     def _init_network(self):
         """Initialize UDP socket and discover body device."""
         try:
             self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            self.udp_socket.settimeout(0.1)  # Non-blocking receive
-            self.udp_socket.bind(('', Config.BODY_PORT))
+            self.udp_socket.setblocking(False)  # receive_status() drains without waiting
+            if hasattr(socket, "SO_REUSEPORT"):
+                self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             
             # Try to discover body or use configured IP
             if Config.BODY_IP:
                 self.body_ip = Config.BODY_IP
                 # Try resolving hostname early so subsequent sends use an IP
                 self._resolve_body_ip()
-                self._send_udp("PING")
+                self._bind_udp()
+                self._send_udp(b"PING")
                 # Enable servos on startup
-                self._send_udp("SERVO_ENABLE")
+                self._send_udp(b"SERVO_ENABLE")
                 print(f"✅ Network mode: {self.body_ip}:{self.body_port}")
                 self.connected = True
             else:
                 # Broadcast discovery
                 if self._discover_body():
+                    self._bind_udp()
                     self.connected = True
                 else:
                     print("⚠️ Body not discovered, trying serial...")
         except Exception as e:
             print(f"⚠️ Network init failed: {e}")
     
+    def _bind_udp(self):
+        """Bind the status socket to the local interface that routes to the body,
+        so broadcasts and traffic from other subnets never reach it."""
+        local_ip = ''
+        try:
+            # Connecting a UDP socket sends nothing; it just selects the route
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+                probe.connect((self.body_ip, Config.BODY_PORT))
+                local_ip = probe.getsockname()[0]
+        except OSError:
+            pass  # No route yet - listen on all interfaces
+        self.udp_socket.bind((local_ip, Config.BODY_PORT))
+        try:
+            self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+            # DSCP EF - Wi-Fi WMM puts it in the voice (lowest-latency) queue
+            self.udp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0xB8)
+        except (OSError, AttributeError):
+            pass  # Best effort - not every platform exposes/permits these
+        if local_ip:
+            self._connect_udp()
+    
+    def _connect_udp(self):
+        """Fix the peer once so each send() skips the route/address lookup
+        sendto() does, and only the body's replies are delivered to us."""
+        try:
+            self.udp_socket.connect((self.body_ip, self.body_port))
+            self._udp_connected = True
+        except OSError as e:
+            self._udp_connected = False
+            print(f"⚠️ UDP connect failed: {e}")
+    
+    def _start_io_thread(self):
+        """Hand the UDP socket to a dedicated I/O thread: callers only enqueue."""
+        self._tx_q = queue.SimpleQueue()
+        # Writing a byte here wakes the I/O thread out of select() immediately
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._io_running = True
+        self._io_thread = threading.Thread(target=self._io_loop, name="lumina-udp", daemon=True)
+        self._io_thread.start()
+    
+    # Largest batched datagram - the body reads into a 256-byte buffer
+    MAX_DATAGRAM = 240
+    
+    @staticmethod
+    def _state_key(cmd: bytes):
+        """Key for commands that only set state, where a later one in the same
+        batch makes earlier ones redundant; None for everything else."""
+        if cmd.startswith(b"F_"):
+            # TALK_START/STOP also switch the amplifier - never dropped
+            return None if cmd.startswith(b"F_TALK") else b"F"
+        if cmd.startswith(b"SERVO_PAN:"):
+            return b"PAN"
+        if cmd.startswith(b"TEXT:"):
+            return b"TEXT"
+        if cmd.startswith(b"COLOR:") or (cmd.startswith(b"C") and b"," in cmd):
+            return b"COLOR"
+        if cmd.startswith(b"B") and cmd[1:].isdigit():
+            return b"B"
+        return None
+    
+    def _io_loop(self):
+        """Send queued commands and handle incoming status messages."""
+        while self._io_running:
+            try:
+                readable, _, _ = select.select([self.udp_socket, self._wake_r], [], [], 0.1)
+            except (OSError, ValueError):
+                break  # Socket closed underneath us
+            if self._wake_r in readable:
+                try:
+                    while self._wake_r.recv(256):
+                        pass
+                except BlockingIOError:
+                    pass
+            if self.udp_socket in readable:
+                self.receive_status()
+            pending = []
+            while True:
+                try:
+                    pending.append(self._tx_q.get_nowait())
+                except queue.Empty:
+                    break
+            if not pending:
+                continue
+            # Keep only the last face/colour/brightness/etc. of each kind,
+            # in order, then pack what is left into as few newline-separated
+            # datagrams as the body's receive buffer allows
+            seen = set()
+            commands = []
+            for data in reversed(pending):
+                key = self._state_key(data)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                commands.append(data)
+            batch = b""
+            for data in reversed(commands):
+                if batch and len(batch) + 1 + len(data) > self.MAX_DATAGRAM:
+                    self._send_udp(batch)
+                    batch = b""
+                batch = batch + b"\n" + data if batch else data
+            if batch:
+                self._send_udp(batch)
+    
     def _discover_body(self) -> bool:
         """Broadcast UDP discovery to find body device."""
         print("🔍 Discovering Lumina Body...")
@@ -295,23 +497,34 @@ class RobotController:
             if ip and ip != self.body_ip:
                 print(f"🔍 Resolved body hostname {self.body_ip} -> {ip}")
                 self.body_ip = ip
+                if self._udp_connected:
+                    self._connect_udp()
             return True
         except Exception as e:
             print(f"⚠️ Failed to resolve body hostname '{self.body_ip}': {e}")
             return False
 
-    def _send_udp(self, cmd: str):
-        """Send command via UDP to body. Attempts to resolve hostname on failure."""
+    def _send_udp(self, data: bytes):
+        """Send an encoded command via UDP to body. Attempts to resolve hostname on failure."""
         if self.udp_socket and self.body_ip:
             try:
-                print(f"📡 Sending to ESP32: {cmd}")  # Debug: show what's being sent
-                self.udp_socket.sendto(cmd.encode(), (self.body_ip, self.body_port))
+                if Config.DEBUG_COMMANDS:
+                    print(f"📡 Sending to ESP32: {data.decode()}")
+                if self._udp_connected:
+                    self.udp_socket.send(data)
+                else:
+                    self.udp_socket.sendto(data, (self.body_ip, self.body_port))
+            except ConnectionRefusedError:
+                pass  # ICMP port-unreachable from an earlier send: body not listening yet
             except socket.gaierror as e:
                 # Name resolution failed - try to resolve explicitly and retry once
                 print(f"⚠️ UDP send error: {e} - attempting to resolve hostname")
                 if self._resolve_body_ip():
                     try:
-                        self.udp_socket.sendto(cmd.encode(), (self.body_ip, self.body_port))
+                        if self._udp_connected:
+                            self.udp_socket.send(data)
+                        else:
+                            self.udp_socket.sendto(data, (self.body_ip, self.body_port))
                         return
                     except Exception as e2:
                         print(f"⚠️ UDP send error after resolve: {e2}")
@@ -321,19 +534,25 @@ class RobotController:
             except Exception as e:
                 print(f"⚠️ UDP send error: {e}")
     
+    # Most status datagrams handled per call, so a chatty body can't hold
+    # up queued sends; anything left over keeps the socket readable
+    MAX_STATUS_BATCH = 16
+    
     def receive_status(self) -> str:
-        """Check for incoming status from body (non-blocking)."""
+        """Handle pending status messages from body (non-blocking), up to MAX_STATUS_BATCH.
+        Returns the most recent one, or None if nothing was queued."""
+        latest = None
         if self.udp_socket:
-            try:
-                data, addr = self.udp_socket.recvfrom(256)
-                status = data.decode().strip()
-                self._handle_status(status)
-                return status
-            except socket.timeout:
-                pass
-            except Exception:
-                pass
-        return None
+            for _ in range(self.MAX_STATUS_BATCH):
+                try:
+                    data, addr = self.udp_socket.recvfrom(256)
+                except (BlockingIOError, socket.timeout):
+                    break
+                except Exception:
+                    break
+                latest = data.decode().strip()
+                self._handle_status(latest)
+        return latest
     
     def _handle_status(self, status: str):
         """Process status messages from body."""
@@ -360,8 +579,9 @@ class RobotController:
                 desc = ' '.join(filter(None, [p.device, p.description, p.manufacturer])).lower()
                 if tok in desc:
                     try:
-                        self.serial = serial.Serial(p.device, Config.BAUD_RATE, timeout=0.1)
-                        time.sleep(2)
+                        # write_timeout=0: never block the frame loop on a full TX buffer
+                        self.serial = serial.Serial(p.device, Config.BAUD_RATE, timeout=0.1, write_timeout=0)
+                        self._wait_for_boot()
                         print(f"✅ Serial connected: {p.device}")
                         self.connected = True
                         self.use_network = False
@@ -370,41 +590,105 @@ class RobotController:
                         pass
         print("⚠️ Robot not connected (simulation mode)")
     
-    def send_command(self, cmd: str):
+    def _wait_for_boot(self, timeout=2.0):
+        """Opening the port resets the ESP32; return once its firmware banner
+        arrives instead of always sleeping for the full timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self.serial.readline()  # Returns after at most the 0.1s read timeout
+            if b"Lumina" in line:
+                return True
+        return False
+    
+    def send_command(self, cmd):
+        """Send a command (str, or already-encoded bytes) to the body."""
+        if isinstance(cmd, str):
+            cmd = cmd.encode()
+        if b"\n" in cmd or b"\r" in cmd:
+            # Commands are newline-delimited on both serial and batched UDP
+            print(f"⚠️ Dropping command with embedded newline: {cmd!r}")
+            return
         if self.use_network and self.body_ip:
-            self._send_udp(cmd)
+            if self._io_thread:
+                self._tx_q.put(cmd)
+                try:
+                    self._wake_w.send(b"\0")
+                except OSError:
+                    pass  # Wakeup already pending
+            else:
+                self._send_udp(cmd)
         elif self.serial:
-            try:
-                self.serial.write(f"{cmd}\n".encode())
-            except:
-                pass
+            # Buffered; flush() sends everything queued as a single write
+            with self._tx_lock:
+                self._tx_buf += cmd
+                self._tx_buf += b"\n"
     
-    def move(self, pan: int, tilt: int):
-        """Move servos with rate limiting and smart command filtering."""
-        now = time.time()
-        
-        # Skip if sending too fast (rate limiting)
-        if now - self._last_move_time < self._move_interval:
-            return
-        
-        # Only send pan commands (tilt disabled)
-        pan_changed = pan != self._last_pan
+    def flush(self):
+        """Write all buffered serial commands in one call (once per frame).
         
-        if not pan_changed:
+        The port never blocks (write_timeout=0), so the write happens under
+        _tx_lock: flushes from the servo thread and the main loop can't reorder
+        or interleave, and bytes the port didn't take stay at the front of the
+        buffer for the next flush instead of cutting a command in half.
+        """
+        if not self.serial:
             return
-        
-        # Update tracking
-        self._last_move_time = now
-        self._last_pan = pan
-        
-        # Send only pan command (tilt servo disabled)
-        self.send_command(f"SERVO_PAN:{pan}")
+        with self._tx_lock:
+            if not self._tx_buf:
+                return
+            try:
+                written = self.serial.write(self._tx_buf)
+            except serial.SerialException as e:
+                print(f"⚠️ Serial write error: {e}")
+                self._tx_buf.clear()
+                return
+            del self._tx_buf[:written or 0]
+    
+    # Pre-encoded pan commands for every angle - sent up to SERVO_MAX_RATE_HZ
+    _PAN_COMMANDS = [f"SERVO_PAN:{angle}".encode() for angle in range(181)]
+    
+    def move(self, pan: int, tilt: int):
+        """Set the servo target. The servo thread smooths it and sends it at a fixed rate."""
+        with self._servo_lock:
+            self._servo_target = pan  # Only pan is driven (tilt servo disabled)
+        self._servo_wake.set()
+    
+    def _servo_loop(self):
+        """Fixed-tick servo output: EMA toward the latest target, send on change.
+        Sleeps until the next move() once the output has reached the target."""
+        interval = 1.0 / Config.SERVO_MAX_RATE_HZ
+        smoothed = float(self._last_pan)
+        next_tick = time.monotonic()
+        while self._servo_running:
+            self._servo_wake.clear()  # Before reading, so a concurrent move() is never missed
+            with self._servo_lock:
+                target = self._servo_target
+            if target is not None:
+                smoothed += Config.SERVO_EMA_ALPHA * (target - smoothed)
+                pan = int(round(smoothed))
+                if pan != self._last_pan:
+                    self._last_pan = pan
+                    self.send_command(self._PAN_COMMANDS[pan] if 0 <= pan <= 180 else b"SERVO_PAN:%d" % pan)
+                    self.flush()
+            
+            if target is None or abs(target - smoothed) < 0.5:
+                # Settled (the rounded output already equals the target)
+                self._servo_wake.wait()
+                next_tick = time.monotonic()
+                continue
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # Fell behind - don't try to catch up
     
     # Current face state for simulation display
     current_face = "SLEEP"
     
     # Valid face states (must match ESP32 firmware)
     VALID_FACES = ['HAPPY', 'SAD', 'LOVE', 'SLEEP', 'LISTENING', 'TALKING']
+    _FACE_COMMANDS = {face: f"F_{face}".encode() for face in VALID_FACES}
     
     def set_face(self, face: str):
         """Set face emotion: HAPPY, SAD, LOVE, SLEEP, LISTENING, TALKING"""
@@ -419,63 +703,68 @@ class RobotController:
 
         if face in self.VALID_FACES:
             RobotController.current_face = face
-            self.send_command(f"F_{face}")
+            self.send_command(self._FACE_COMMANDS[face])
             print(f"😊 Face: {face}")
         else:
             print(f"⚠️ Unknown face: {face}, using HAPPY")
-            self.send_command("F_HAPPY")
+            self.send_command(self._FACE_COMMANDS["HAPPY"])
+    
+    # Natural-language mood words -> face states
+    EMOTION_MAP = {
+        # Happy emotions
+        "happy": "HAPPY",
+        "excited": "HAPPY",
+        "laugh": "HAPPY",
+        "haha": "HAPPY",
+        "joy": "HAPPY",
+        "great": "HAPPY",
+        "wonderful": "HAPPY",
+        "pleased": "HAPPY",
+        "glad": "HAPPY",
+        "delighted": "HAPPY",
+        # Love emotions
+        "love": "LOVE",
+        "adore": "LOVE",
+        "sweet": "LOVE",
+        "heart": "LOVE",
+        "affection": "LOVE",
+        "care": "LOVE",
+        # Sad emotions (only explicit sad words remain)
+        "sad": "SAD",
+        "unfortunate": "SAD",
+        "regret": "SAD",
+        "sympathy": "SAD",
+        "condolence": "SAD",
+        # Thinking/Listening states
+        "think": "LISTENING",
+        "hmm": "LISTENING",
+        "wonder": "LISTENING",
+        "consider": "LISTENING",
+        "ponder": "LISTENING",
+        "curious": "LISTENING",
+        # Surprise (map to happy with eyes wide)
+        "wow": "HAPPY",
+        "surprise": "HAPPY",
+        "amazing": "HAPPY",
+        # Sleep/Calm
+        "sleep": "SLEEP",
+        "rest": "SLEEP",
+        "calm": "SLEEP",
+        "peaceful": "SLEEP",
+        "goodnight": "SLEEP",
+    }
     
     def set_emotion(self, emotion: str):
         """Set emotion based on detected mood - maps natural language to faces."""
-        emotion_map = {
-            # Happy emotions
-            "happy": "HAPPY",
-            "excited": "HAPPY",
-            "laugh": "HAPPY",
-            "haha": "HAPPY",
-            "joy": "HAPPY",
-            "great": "HAPPY",
-            "wonderful": "HAPPY",
-            "pleased": "HAPPY",
-            "glad": "HAPPY",
-            "delighted": "HAPPY",
-            # Love emotions
-            "love": "LOVE",
-            "adore": "LOVE",
-            "sweet": "LOVE",
-            "heart": "LOVE",
-            "affection": "LOVE",
-            "care": "LOVE",
-            # Sad emotions (only explicit sad words remain)
-            "sad": "SAD",
-            "unfortunate": "SAD",
-            "regret": "SAD",
-            "sympathy": "SAD",
-            "condolence": "SAD",
-            # Thinking/Listening states
-            "think": "LISTENING",
-            "hmm": "LISTENING",
-            "wonder": "LISTENING",
-            "consider": "LISTENING",
-            "ponder": "LISTENING",
-            "curious": "LISTENING",
-            # Surprise (map to happy with eyes wide)
-            "wow": "HAPPY",
-            "surprise": "HAPPY",
-            "amazing": "HAPPY",
-            # Sleep/Calm
-            "sleep": "SLEEP",
-            "rest": "SLEEP",
-            "calm": "SLEEP",
-            "peaceful": "SLEEP",
-            "goodnight": "SLEEP",
-        }
-        face = emotion_map.get(emotion.lower(), "HAPPY")
+        # Tags are usually lower-case already - only fold when the exact key misses
+        face = self.EMOTION_MAP.get(emotion) or self.EMOTION_MAP.get(emotion.lower(), "HAPPY")
         print(f"🔔 set_emotion: '{emotion}' -> {face}")
         self.set_face(face)
     
     def display_text(self, text: str):
         """Display text on the OLED screen."""
+        # One line only - a newline would split it into two commands on the body
+        text = " ".join(text.splitlines())
         # Limit text length for display
         text = text[:30] if len(text) > 30 else text
         self.send_command(f"TEXT:{text}")
@@ -484,69 +773,77 @@ class RobotController:
     def talk_start(self):
         # Show talking face when AI is speaking
         RobotController.current_face = "TALK_START"
-        self.send_command("F_TALK_START")
+        self.send_command(b"F_TALK_START")
         print(f"📺 Talk start - face: TALK_START")
     
     def talk_stop(self):
         # Show LISTENING face when AI stops speaking (user's turn)
         RobotController.current_face = "LISTENING"
-        self.send_command("F_TALK_STOP")
+        self.send_command(b"F_TALK_STOP")
         print(f"📺 Talk stop - face: LISTENING")
     
     # Current LED state for simulation
     current_brightness = 100
     current_color = (255, 255, 255)  # RGB white
+    _BRIGHTNESS_COMMANDS = [f"B{level}".encode() for level in range(101)]
     
     def set_brightness(self, level: int):
         """Set LED brightness 0-100."""
         level = max(0, min(100, level))
         RobotController.current_brightness = level
-        self.send_command(f"B{level}")
+        self.send_command(self._BRIGHTNESS_COMMANDS[level])
         print(f"💡 Brightness: {level}%")
     
     def set_color(self, r: int, g: int, b: int):
         """Set LED color RGB (0-255 each)."""
         r, g, b = max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
         RobotController.current_color = (r, g, b)
-        self.send_command(f"C{r},{g},{b}")
+        self.send_command(b"C%d,%d,%d" % (r, g, b))
         print(f"🎨 Color: RGB({r},{g},{b}) - DEBUG: current_color set to {RobotController.current_color}")
     
+    # Named colors understood by set_color_name() (the ESP32 has its own copy)
+    COLOR_TABLE = {
+        "red": (255, 0, 0),
+        "green": (0, 255, 0),
+        "blue": (0, 0, 255),
+        "yellow": (255, 255, 0),
+        "orange": (255, 165, 0),
+        "purple": (128, 0, 128),
+        "pink": (255, 105, 180),
+        "cyan": (0, 255, 255),
+        "white": (255, 255, 255),
+        "warm": (255, 200, 100),
+        "cool": (200, 220, 255),
+        # Additional colors
+        "gold": (255, 215, 0),
+        "lime": (0, 255, 128),
+        "teal": (0, 128, 128),
+        "indigo": (75, 0, 130),
+        "violet": (238, 130, 238),
+        "coral": (255, 127, 80),
+        "salmon": (250, 128, 114),
+        "lavender": (230, 190, 255),
+        "mint": (152, 255, 152),
+        "amber": (255, 191, 0),
+        "sunset": (255, 100, 50),
+        "ocean": (0, 119, 190),
+        "forest": (34, 139, 34),
+        "off": (0, 0, 0),
+    }
+    
+    # Pre-encoded COLOR: commands for every name in COLOR_TABLE
+    _COLOR_COMMANDS = {name: f"COLOR:{name}".encode() for name in COLOR_TABLE}
+    
     def set_color_name(self, color_name: str):
         """Set LED color by name."""
-        colors = {
-            "red": (255, 0, 0),
-            "green": (0, 255, 0),
-            "blue": (0, 0, 255),
-            "yellow": (255, 255, 0),
-            "orange": (255, 165, 0),
-            "purple": (128, 0, 128),
-            "pink": (255, 105, 180),
-            "cyan": (0, 255, 255),
-            "white": (255, 255, 255),
-            "warm": (255, 200, 100),
-            "cool": (200, 220, 255),
-            # Additional colors
-            "gold": (255, 215, 0),
-            "lime": (0, 255, 128),
-            "teal": (0, 128, 128),
-            "indigo": (75, 0, 130),
-            "violet": (238, 130, 238),
-            "coral": (255, 127, 80),
-            "salmon": (250, 128, 114),
-            "lavender": (230, 190, 255),
-            "mint": (152, 255, 152),
-            "amber": (255, 191, 0),
-            "sunset": (255, 100, 50),
-            "ocean": (0, 119, 190),
-            "forest": (34, 139, 34),
-            "off": (0, 0, 0),
-        }
-        color_lower = color_name.lower().strip()
-        if color_lower in colors:
-            r, g, b = colors[color_lower]
+        # Tags are usually lower-case already - only normalise when the exact key misses
+        color_lower = color_name if color_name in self.COLOR_TABLE else color_name.lower().strip()
+        rgb = self.COLOR_TABLE.get(color_lower)
+        if rgb is not None:
+            r, g, b = rgb
             # Update simulation state
             RobotController.current_color = (r, g, b)
-            self.send_command(f"COLOR:{color_name}")
+            self.send_command(self._COLOR_COMMANDS[color_lower])  # The body lower-cases names too
             print(f"🎨 Color: {color_name} RGB({r},{g},{b}) - DEBUG: current_color set to {RobotController.current_color}")
         else:
             # Try to send as-is to ESP32 which also has color parsing
@@ -554,8 +851,23 @@ class RobotController:
     
     def close(self):
         """Close all connections."""
+        self._servo_running = False
+        self._servo_wake.set()
+        if self._servo_thread:
+            self._servo_thread.join(timeout=1.0)
         if self.serial:
+            self.flush()
             self.serial.close()
+        if self._io_thread:
+            # Stop after one last pass that sends anything still queued
+            self._io_running = False
+            try:
+                self._wake_w.send(b"\0")
+            except OSError:
+                pass
+            self._io_thread.join(timeout=1.0)
+            self._wake_r.close()
+            self._wake_w.close()
         if self.udp_socket:
             try:
                 self.udp_socket.close()
@@ -568,14 +880,21 @@ class MJPEGStreamReader:
     """
     Optimized MJPEG stream reader for ESP32-CAM.
     
-    Uses OpenCV VideoCapture which handles MJPEG parsing internally.
-    This is more reliable than manual HTTP parsing.
+    Reads the multipart HTTP stream directly and splits it into JPEG frames
+    on the SOI/EOI markers. grab() only locates the next frame in the receive
+    buffer; retrieve() decodes it in place with cv2.imdecode, so skipped frames
+    are never decoded or copied.
     """
+    READ_SIZE = 16384  # Bytes per socket read
+    MAX_BUFFER = 1 << 20  # Drop buffered data if no complete frame within 1 MB
+    
     def __init__(self, url, timeout=10):
         self.url = url
         self.timeout = timeout
-        self.cap = None
+        self.stream = None
         self.opened = False
+        self._buf = bytearray()  # Grabbed frame (if any) starts at offset 0
+        self._frame_len = 0      # Length of the grabbed JPEG, 0 if none
         self._connect()
     
     def _get_base_url(self):
@@ -605,48 +924,81 @@ class MJPEGStreamReader:
             # Force disconnect any previous client
             self._check_and_disconnect_previous()
             
-            # Use OpenCV's VideoCapture which handles MJPEG internally
-            # Set buffer size to 1 to always get latest frame
-            self.cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            
-            if self.cap.isOpened():
-                # Read one frame to verify connection
-                ret, _ = self.cap.read()
-                if ret:
-                    self.opened = True
-                    print(f"   ✓ Stream connected: {self.url}")
-                else:
-                    print(f"   ⚠️ Stream opened but no frames")
-                    self.opened = True  # Keep trying
+            self.stream = urllib.request.urlopen(self.url, timeout=self.timeout)
+            self.opened = True
+            # Read one frame to verify connection
+            if self.grab():
+                print(f"   ✓ Stream connected: {self.url}")
             else:
-                print(f"   ❌ Failed to open stream: {self.url}")
-                self.opened = False
+                print(f"   ⚠️ Stream opened but no frames")  # Keep trying
         except Exception as e:
             print(f"   ❌ Stream error: {e}")
             self.opened = False
     
     def isOpened(self):
-        return self.opened and self.cap is not None and self.cap.isOpened()
+        return self.opened and self.stream is not None
     
-    def read(self):
-        """Read a frame - OpenCV handles MJPEG parsing."""
+    def grab(self):
+        """Read up to the end of the next JPEG frame without decoding it."""
         if not self.isOpened():
-            return False, None
-        
+            return False
+        buf = self._buf
+        # Drop the previously grabbed frame (kept until now for retrieve())
+        del buf[:self._frame_len]
+        self._frame_len = 0
         try:
-            # Grab and retrieve to minimize latency
-            if self.cap.grab():
-                ret, frame = self.cap.retrieve()
-                return ret, frame
-            return False, None
+            in_frame = False
+            scan = 0  # Resume marker searches here instead of rescanning the buffer
+            while True:
+                if not in_frame:
+                    start = buf.find(b"\xff\xd8", scan)  # SOI
+                    if start != -1:
+                        del buf[:start]  # Drop multipart headers
+                        in_frame = True
+                        scan = 2
+                    else:
+                        del buf[:-1]  # Keep a possible split marker byte
+                        scan = 0
+                if in_frame:
+                    end = buf.find(b"\xff\xd9", scan)  # EOI
+                    if end != -1:
+                        self._frame_len = end + 2
+                        return True
+                    scan = max(len(buf) - 1, 2)
+                if len(buf) > self.MAX_BUFFER:
+                    buf.clear()
+                    in_frame = False
+                    scan = 0
+                chunk = self.stream.read1(self.READ_SIZE)
+                if not chunk:
+                    self.opened = False  # Server closed the stream
+                    return False
+                buf += chunk
         except Exception:
+            return False
+    
+    def retrieve(self):
+        """Decode the most recently grabbed frame."""
+        if not self._frame_len:
             return False, None
+        # Decode straight from the receive buffer - no per-frame bytes copy
+        frame = cv2.imdecode(np.frombuffer(self._buf, np.uint8, count=self._frame_len), cv2.IMREAD_COLOR)
+        return frame is not None, frame
+    
+    def read(self):
+        """Read and decode the next frame."""
+        if self.grab():
+            return self.retrieve()
+        return False, None
     
     def release(self):
         """Release the stream."""
-        if self.cap:
-            self.cap.release()
+        if self.stream:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
         self.opened = False
         
         # Signal ESP32-CAM we're done
@@ -685,6 +1037,14 @@ class CameraStream:
         """Connect to ESP32-CAM MJPEG stream."""
         self.stream_url = f"http://{self.cam_ip}:{Config.CAM_PORT}/stream"
         print(f"🔍 Trying ESP32-CAM at {self.cam_ip}...")
+        # Quick TCP probe so an unreachable camera fails in 0.3s, not after
+        # the HTTP status check and stream timeouts
+        try:
+            with socket.create_connection((self.cam_ip, Config.CAM_PORT), timeout=0.3):
+                pass
+        except OSError as e:
+            print(f"⚠️ ESP32-CAM not reachable: {e}")
+            return
         try:
             # Use custom MJPEG reader (more reliable for ESP32-CAM)
             self.cap = MJPEGStreamReader(self.stream_url, timeout=15)
@@ -714,10 +1074,22 @@ class CameraStream:
         else:
             print("❌ No camera available")
     
+    def grab(self):
+        """Advance to the next frame without decoding it (drains driver buffers)."""
+        if self.cap and self.cap.isOpened():
+            return self.cap.grab()
+        return False
+    
     def read(self):
         """Read a frame from the camera, with brightness enhancement for ESP32-CAM."""
+        if self.grab():
+            return self.retrieve()
+        return False, None
+    
+    def retrieve(self):
+        """Decode the last grabbed frame, with brightness enhancement for ESP32-CAM."""
         if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
+            ret, frame = self.cap.retrieve()
             if ret:
                 # Enhance ESP32-CAM image (it's typically dull/dark)
                 if self.source == "esp32cam" and frame is not None:
@@ -743,10 +1115,15 @@ class CameraStream:
 
 
 # ============== OLED SIMULATION ==============
-def draw_oled_simulation(img, face: str, x=10, y=80):
-    """Draw a simulated OLED display showing the current face/emotion."""
-    # OLED frame (128x64 simulated)
-    oled_w, oled_h = 100, 60
+# OLED frame (128x64 simulated)
+OLED_W, OLED_H = 100, 60
+_OLED_PAD = 2  # The 2px border is drawn one pixel outside the frame
+_OLED_SPRITES = {}  # face -> (pixels, mask), rendered on first use
+
+
+def _draw_oled_face(img, face: str, x, y):
+    """Draw the OLED background and face with its top-left corner at (x, y)."""
+    oled_w, oled_h = OLED_W, OLED_H
     
     # Draw OLED background (black with border)
     cv2.rectangle(img, (x, y), (x + oled_w, y + oled_h), (40, 40, 40), -1)
@@ -819,6 +1196,35 @@ def draw_oled_simulation(img, face: str, x=10, y=80):
         # Zzz
         cv2.putText(img, "z", (cx + 30, cy - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (150, 150, 150), 1)
         cv2.putText(img, "Z", (cx + 38, cy - 18), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (150, 150, 150), 1)
+
+
+def _oled_sprite(face: str):
+    """Pre-rendered face as (pixels, mask); the mask marks the pixels the face covers."""
+    sprite = _OLED_SPRITES.get(face)
+    if sprite is None:
+        size = (OLED_H + 2 * _OLED_PAD + 1, OLED_W + 2 * _OLED_PAD + 1, 3)
+        # Render on black and on white: pixels that match were drawn, the rest
+        # are background that must show through
+        on_black = np.zeros(size, np.uint8)
+        on_white = np.full(size, 255, np.uint8)
+        _draw_oled_face(on_black, face, _OLED_PAD, _OLED_PAD)
+        _draw_oled_face(on_white, face, _OLED_PAD, _OLED_PAD)
+        mask = (on_black == on_white).all(axis=2, keepdims=True)
+        sprite = _OLED_SPRITES[face] = (on_black, mask)
+    return sprite
+
+
+def draw_oled_simulation(img, face: str, x=10, y=80):
+    """Draw a simulated OLED display showing the current face/emotion.
+    Faces only change on set_face(), so each is drawn once and then blitted."""
+    pixels, mask = _oled_sprite(face)
+    x0, y0 = x - _OLED_PAD, y - _OLED_PAD
+    sh, sw = mask.shape[:2]
+    if x0 >= 0 and y0 >= 0 and y0 + sh <= img.shape[0] and x0 + sw <= img.shape[1]:
+        np.copyto(img[y0:y0 + sh, x0:x0 + sw], pixels, where=mask)
+    else:
+        _draw_oled_face(img, face, x, y)  # Partly off-screen
+    oled_h = OLED_H
     
     # Label
     cv2.putText(img, face, (x + 5, y + oled_h + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
@@ -849,9 +1255,14 @@ def draw_led_simulation(img, x=10, y=160):
     
     # Glow effect (multiple circles with decreasing alpha)
     if brightness > 20:
-        overlay = img.copy()
-        cv2.circle(overlay, (x + 30, y + 25), 30, bgr, -1)
-        cv2.addWeighted(overlay, 0.3, img, 0.7, 0, img)
+        # Blend only the glow's bounding box, not the whole frame
+        cx, cy, radius = x + 30, y + 25, 30
+        x0, y0 = max(cx - radius, 0), max(cy - radius, 0)
+        x1, y1 = min(cx + radius + 1, img.shape[1]), min(cy + radius + 1, img.shape[0])
+        roi = img[y0:y1, x0:x1]
+        overlay = roi.copy()
+        cv2.circle(overlay, (cx - x0, cy - y0), radius, bgr, -1)
+        cv2.addWeighted(overlay, 0.3, roi, 0.7, 0, roi)
     
     # Brightness bar
     bar_w = 60
@@ -866,164 +1277,397 @@ def draw_led_simulation(img, x=10, y=160):
 
 
 # ============== VISION SYSTEM ==============
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _dist2d_sq(pts, i, j):
+        dx = pts[i, 0] - pts[j, 0]
+        dy = pts[i, 1] - pts[j, 1]
+        return dx * dx + dy * dy
+
+    @njit(cache=True, fastmath=True)
+    def _dist2d(pts, i, j):
+        return math.sqrt(_dist2d_sq(pts, i, j))
+
+    @njit(cache=True, fastmath=True)
+    def _validate_hand(pts, img_width, img_height, palm_sign, max_gap):
+        """Compiled aspect ratio, finger straightness, fingertip gaps and palm
+        normal in one pass. Matches the NumPy methods on VisionSystem, which
+        remain the fallback. palm_sign is VisionSystem.palm_sign(label)."""
+        # Bounding box / aspect ratio
+        min_x = max_x = pts[0, 0]
+        min_y = max_y = pts[0, 1]
+        for i in range(1, pts.shape[0]):
+            min_x = min(min_x, pts[i, 0])
+            max_x = max(max_x, pts[i, 0])
+            min_y = min(min_y, pts[i, 1])
+            max_y = max(max_y, pts[i, 1])
+        box_w = (max_x - min_x) * img_width
+        box_h = (max_y - min_y) * img_height
+        if box_w == 0:
+            ratio = 0.0
+            box = (0, 0, 0, 0)
+        else:
+            ratio = box_h / box_w
+            box = (int(min_x * img_width), int(min_y * img_height),
+                   int(max_x * img_width), int(max_y * img_height))
+
+        # Finger straightness (index, middle, ring, pinky)
+        straightness = np.inf
+        for mcp in (5, 9, 13, 17):
+            pip, dip, tip = mcp + 1, mcp + 2, mcp + 3
+            if _dist2d_sq(pts, tip, 0) < _dist2d_sq(pts, pip, 0):
+                straightness = 0.0  # Curled finger
+                break
+            total = _dist2d(pts, pip, mcp) + _dist2d(pts, dip, pip) + _dist2d(pts, tip, dip)
+            score = _dist2d(pts, tip, mcp) / total if total > 0 else 0.0
+            straightness = min(straightness, score)
+
+        # Fingers together: every adjacent fingertip gap within max_gap
+        together = True
+        for tip in (8, 12, 16):
+            if _dist2d_sq(pts, tip, tip + 4) > max_gap * max_gap:
+                together = False
+                break
+
+        # Palm normal: (wrist->index_mcp) x (wrist->pinky_mcp)
+        v1x, v1y, v1z = pts[5, 0] - pts[0, 0], pts[5, 1] - pts[0, 1], pts[5, 2] - pts[0, 2]
+        v2x, v2y, v2z = pts[17, 0] - pts[0, 0], pts[17, 1] - pts[0, 1], pts[17, 2] - pts[0, 2]
+        nx = v1y * v2z - v1z * v2y
+        ny = v1z * v2x - v1x * v2z
+        nz = v1x * v2y - v1y * v2x
+        is_palm = palm_sign * nz > 1e-4
+        return ratio, box, straightness, together, (nx, ny, nz), is_palm
+
+
 class VisionSystem:
+    # Returned by _detect() when no new LIVE_STREAM result has arrived yet
+    _STALE = object()
+
     def __init__(self):
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            model_complexity=1,
-            min_detection_confidence=0.8,
-            min_tracking_confidence=0.8,
-            max_num_hands=1
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+        self.hands = None
+        self.landmarker = None
+        
+        # Prefer the MediaPipe Tasks HandLandmarker (async LIVE_STREAM mode)
+        # when its model bundle is available, else the legacy Hands solution
+        model_path = Config.HAND_LANDMARKER_MODEL
+        if model_path and os.path.exists(model_path):
+            self._init_landmarker(model_path)
+        else:
+            self.hands = self.mp_hands.Hands(
+                # Video mode: once a hand is found, the next frame's landmark model
+                # runs on an ROI derived from the previous landmarks and the palm
+                # detector only reruns when tracking confidence drops
+                static_image_mode=False,
+                model_complexity=Config.MODEL_COMPLEXITY,
+                min_detection_confidence=Config.MIN_DETECTION_CONFIDENCE,
+                min_tracking_confidence=Config.MIN_TRACKING_CONFIDENCE,
+                max_num_hands=1
+            )
         self.current_pan = 90.0
         self.current_tilt = 90.0
+        # Hand skeleton overlay - off until main() enters TRACKING
+        self.show_landmarks = False
+        self._last_output = (False, int(self.current_pan), int(self.current_tilt), (0, 0, 0, 0), "IDLE")
+        # Landmarks of the hand being tracked (None when no hand) and frames seen since
+        self._last_pts = None
+        self._skip_count = 0
+        # True when the last process() call consumed a new MediaPipe result
+        # (False for tracking-skipped frames and stale async results)
+        self.last_detection_fresh = False
+        # Landmark array refilled in place every frame (process() is single-threaded)
+        self._lm_buf = np.empty((21, 3), dtype=np.float32)
         # Smoothed hand position for filtering jitter
         self.smoothed_hand_x = None
         self.smoothed_hand_y = None
+        # Downscaled BGR and RGB frames handed to MediaPipe, reused across
+        # frames (allocated on first use)
+        self._small_buf = None
+        self._rgb_buf = None
+        # Optional OpenCL (T-API) preprocessing on an integrated GPU
+        self.use_opencl = Config.USE_OPENCL and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+            print(f"🖥️ OpenCL preprocessing: {cv2.ocl.Device.getDefault().name()}")
+        if NUMBA_AVAILABLE:
+            # Compile (or load from cache) now rather than stalling the first tracked frame
+            _validate_hand(np.zeros((21, 3), dtype=np.float32), 1, 1, -1.0, self.MAX_FINGER_GAP)
+
+    def _init_landmarker(self, model_path):
+        """Create a HandLandmarker in LIVE_STREAM mode with a result callback."""
+        self._result_lock = threading.Lock()
+        self._latest_result = None
+        self._latest_result_ts = -1
+        self._consumed_result_ts = -1
+        self._timestamp_ms = 0
+        
+        vision = mp.tasks.vision
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=1,
+            min_hand_detection_confidence=Config.MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=Config.MIN_TRACKING_CONFIDENCE,
+            result_callback=self._on_landmarker_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+        print(f"✋ HandLandmarker (LIVE_STREAM): {model_path}")
+    
+    def _on_landmarker_result(self, result, output_image, timestamp_ms):
+        """Called from MediaPipe's thread with the result for one frame."""
+        with self._result_lock:
+            self._latest_result = result
+            self._latest_result_ts = timestamp_ms
+    
+    def _detect(self, rgb):
+        """Run hand detection on an RGB frame.
+        
+        Returns (landmarks, handedness_label) for the first hand, None if no hand is visible, or _STALE if the async landmarker has
+        not produced a new result since the previous call.
+        """
+        if self.landmarker is None:
+            results = self.hands.process(rgb)
+            if not results.multi_hand_landmarks:
+                return None
+            return (results.multi_hand_landmarks[0].landmark,
+                    results.multi_handedness[0].classification[0].label)
+        
+        # Timestamps must be strictly increasing for LIVE_STREAM mode
+        self._timestamp_ms = max(self._timestamp_ms + 1, int(time.monotonic() * 1000))
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), self._timestamp_ms)
+        
+        with self._result_lock:
+            result, result_ts = self._latest_result, self._latest_result_ts
+        if result_ts == self._consumed_result_ts:
+            return self._STALE
+        self._consumed_result_ts = result_ts
+        if result is None or not result.hand_landmarks:
+            return None
+        
+        return result.hand_landmarks[0], result.handedness[0][0].category_name
+    
+    def close(self):
+        """Release the MediaPipe graph."""
+        if self.landmarker is not None:
+            self.landmarker.close()
+        if self.hands is not None:
+            self.hands.close()
     
     @staticmethod
-    def get_dist(p1, p2) -> float:
-        return math.hypot(p1.x - p2.x, p1.y - p2.y)
-    
-    def calculate_aspect_ratio(self, landmarks, img_width, img_height):
-        x_coords = [lm.x for lm in landmarks]
-        y_coords = [lm.y for lm in landmarks]
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
+    def get_dist2(p1, p2) -> float:
+        """Squared 2D distance - enough wherever only the ordering matters."""
+        dx = p1[0] - p2[0]
+        dy = p1[1] - p2[1]
+        return dx * dx + dy * dy
+    
+    @staticmethod
+    def landmarks_to_array(landmarks, out=None) -> np.ndarray:
+        """Copy MediaPipe landmarks into a (21, 3) float32 array of x, y, z
+        (into out, if given, instead of a new array)."""
+        if out is not None:
+            out.reshape(-1)[:] = [c for p in landmarks for c in (p.x, p.y, p.z)]
+            return out
+        return np.fromiter((c for p in landmarks for c in (p.x, p.y, p.z)),
+                           dtype=np.float32, count=len(landmarks) * 3).reshape(-1, 3)
+    
+    def calculate_aspect_ratio(self, pts, img_width, img_height):
+        min_x, min_y = pts[:, :2].min(axis=0)
+        max_x, max_y = pts[:, :2].max(axis=0)
         box_w = (max_x - min_x) * img_width
         box_h = (max_y - min_y) * img_height
         if box_w == 0:
             return 0, (0, 0, 0, 0)
-        ratio = box_h / box_w
+        ratio = float(box_h / box_w)
         box = (int(min_x * img_width), int(min_y * img_height),
                int(max_x * img_width), int(max_y * img_height))
         return ratio, box
     
-    def calculate_finger_straightness(self, landmarks) -> float:
-        indices = [(5, 8), (9, 12), (13, 16), (17, 20)]
-        scores = []
-        for mcp_idx, tip_idx in indices:
-            mcp = landmarks[mcp_idx]
-            pip = landmarks[mcp_idx + 1]
-            dip = landmarks[mcp_idx + 2]
-            tip = landmarks[tip_idx]
-            if self.get_dist(landmarks[0], tip) < self.get_dist(landmarks[0], pip):
-                return 0.0
-            total = (self.get_dist(mcp, pip) + self.get_dist(pip, dip) + self.get_dist(dip, tip))
-            direct = self.get_dist(mcp, tip)
-            scores.append(direct / total if total > 0 else 0)
-        return min(scores)
-    
-    def check_fingers_together(self, landmarks) -> bool:
+    # Joint indices for index, middle, ring and pinky fingers
+    FINGER_MCP = np.array([5, 9, 13, 17])
+    FINGER_PIP = FINGER_MCP + 1
+    FINGER_DIP = FINGER_MCP + 2
+    FINGER_TIP = FINGER_MCP + 3
+    MAX_FINGER_GAP = 0.08  # Maximum normalized distance between adjacent fingertips
+    
+    def calculate_finger_straightness(self, pts) -> float:
+        xy = pts[:, :2]
+        mcp, pip, dip, tip = xy[self.FINGER_MCP], xy[self.FINGER_PIP], xy[self.FINGER_DIP], xy[self.FINGER_TIP]
+        # A curled finger (tip closer to the wrist than its PIP joint) is never straight
+        # (squared distances - no sqrt needed to compare)
+        if np.any(np.square(tip - xy[0]).sum(axis=1) < np.square(pip - xy[0]).sum(axis=1)):
+            return 0.0
+        total = (np.linalg.norm(pip - mcp, axis=1) + np.linalg.norm(dip - pip, axis=1)
+                 + np.linalg.norm(tip - dip, axis=1))
+        direct = np.linalg.norm(tip - mcp, axis=1)
+        scores = np.divide(direct, total, out=np.zeros_like(direct), where=total > 0)
+        return float(scores.min())
+    
+    def check_fingers_together(self, pts) -> bool:
         """Check if fingers are close together (no gaps between them).
         Returns True if all adjacent finger tips are within a threshold distance."""
-        finger_tips = [landmarks[8], landmarks[12], landmarks[16], landmarks[20]]  # index, middle, ring, pinky tips
-        max_gap = 0.08  # Maximum normalized distance between adjacent fingertips
+        finger_tips = pts[self.FINGER_TIP].tolist()  # index, middle, ring, pinky tips
+        max_gap = self.MAX_FINGER_GAP
         
         for i in range(len(finger_tips) - 1):
-            gap = self.get_dist(finger_tips[i], finger_tips[i + 1])
-            if gap > max_gap:
+            gap2 = self.get_dist2(finger_tips[i], finger_tips[i + 1])
+            if gap2 > max_gap * max_gap:
                 return False
         return True
     
     @staticmethod
-    def is_palm_facing(landmarks, handedness_label: str) -> (bool, tuple):
+    def palm_sign(handedness_label: str) -> float:
+        """Sign the palm normal's z must have (after multiplying) for a palm facing the camera."""
+        return -1.0 if handedness_label == "Right" else 1.0
+    
+    @staticmethod
+    def is_palm_facing(pts, handedness_label: str) -> (bool, tuple):
         """Return (is_facing, normal) where is_facing is True if palm faces camera.
 
         Uses a 3D cross-product between the wrist->index_mcp and wrist->pinky_mcp
         vectors to compute a palm normal. The sign of the normal's z component
         indicates facing direction (heuristic for MediaPipe coords). This function
         returns both a boolean and the computed normal for visualization.
-        Falls back to the simple thumb/pinky heuristic on error.
         """
-        try:
-            p0 = landmarks[0]
-            p5 = landmarks[5]
-            p17 = landmarks[17]
-            # Vectors from wrist to index_mcp and wrist to pinky_mcp
-            v1 = (p5.x - p0.x, p5.y - p0.y, p5.z - p0.z)
-            v2 = (p17.x - p0.x, p17.y - p0.y, p17.z - p0.z)
-            # Cross product v1 x v2
-            nx = v1[1] * v2[2] - v1[2] * v2[1]
-            ny = v1[2] * v2[0] - v1[0] * v2[2]
-            nz = v1[0] * v2[1] - v1[1] * v2[0]
-            # small threshold to avoid noise
-            thresh = 1e-4
-            if handedness_label == "Right":
-                facing = nz < -thresh
-            else:
-                facing = nz > thresh
-            return facing, (nx, ny, nz)
-        except Exception:
-            # Fallback to simple heuristic if something goes wrong
-            thumb_x = landmarks[4].x
-            pinky_x = landmarks[20].x
-            if handedness_label == "Right":
-                return thumb_x < pinky_x, (0.0, 0.0, -1.0)
-            return thumb_x > pinky_x, (0.0, 0.0, 1.0)
-    
-    def process(self, img):
+        # Vectors from wrist to index_mcp and wrist to pinky_mcp
+        v1x, v1y, v1z = (pts[5] - pts[0]).tolist()
+        v2x, v2y, v2z = (pts[17] - pts[0]).tolist()
+        # Cross product v1 x v2
+        nx = v1y * v2z - v1z * v2y
+        ny = v1z * v2x - v1x * v2z
+        nz = v1x * v2y - v1y * v2x
+        # small threshold to avoid noise
+        thresh = 1e-4
+        facing = VisionSystem.palm_sign(handedness_label) * nz > thresh
+        return facing, (nx, ny, nz)
+    
+    # Hand skeleton as polylines (same edges as mp.solutions.hands.HAND_CONNECTIONS):
+    # palm outline plus one chain per finger
+    HAND_POLYLINES = [np.array(chain) for chain in (
+        (1, 0, 5, 9, 13, 17, 0),
+        (1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16), (17, 18, 19, 20),
+    )]
+    
+    def draw_landmarks(self, img, pts):
+        """Draw the hand skeleton: six polylines in one call, then the joints."""
+        h, w = img.shape[:2]
+        xy = (pts[:, :2] * (w, h)).astype(np.int32)
+        cv2.polylines(img, [xy[chain] for chain in self.HAND_POLYLINES], False, (224, 224, 224), 2)
+        for x, y in xy.tolist():
+            cv2.circle(img, (x, y), 3, (0, 0, 255), cv2.FILLED)
+    
+    def process(self, img, draw=True):
+        """Detect the hand and update servo targets. Overlays are drawn onto
+        img only when draw is True (skipped on frames that won't be shown)."""
+        if self._last_pts is not None and Config.TRACKING_FRAME_SKIP > 1:
+            self._skip_count += 1
+            if self._skip_count % Config.TRACKING_FRAME_SKIP:
+                # Skipped frame: keep the servo target and redraw the last skeleton
+                if draw and self.show_landmarks:
+                    self.draw_landmarks(img, self._last_pts)
+                self.last_detection_fresh = False
+                return self._last_output
         h, w, _ = img.shape
         center_x, center_y = w // 2, h // 2
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(img_rgb)
+        # Run MediaPipe on a downscaled copy. Landmarks are normalized to [0, 1],
+        # so they still map onto the full-resolution frame used for drawing.
+        infer_w = min(Config.INFERENCE_WIDTH, w)
+        infer_h = round(h * infer_w / w)
+        if self.use_opencl:
+            # Resize + color conversion on the GPU; only the small RGB frame is downloaded
+            frame = cv2.UMat(img)
+            if infer_w != w:
+                frame = cv2.resize(frame, (infer_w, infer_h), interpolation=cv2.INTER_AREA)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).get()
+        else:
+            if self._rgb_buf is None or self._rgb_buf.shape[:2] != (infer_h, infer_w):
+                self._small_buf = np.empty((infer_h, infer_w, 3), dtype=np.uint8)
+                self._rgb_buf = np.empty_like(self._small_buf)
+            small = img
+            if infer_w != w:
+                small = cv2.resize(img, (infer_w, infer_h), dst=self._small_buf, interpolation=cv2.INTER_AREA)
+            # Convert into a preallocated buffer instead of allocating a new frame each time
+            rgb = self._rgb_buf
+            rgb.flags.writeable = True
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        # Read-only input lets MediaPipe skip its own defensive copy
+        rgb.flags.writeable = False
+        detection = self._detect(rgb)
+        self.last_detection_fresh = detection is not self._STALE
+        if detection is self._STALE:
+            # No new landmarks yet - repeat the last output rather than
+            # integrating the same servo error twice
+            return self._last_output
         
         locked = False
         box = (0, 0, 0, 0)
         status_msg = "IDLE"
+        self._last_pts = None
         
-        if results.multi_hand_landmarks:
-            hand_lms = results.multi_hand_landmarks[0]
-            label = results.multi_handedness[0].classification[0].label
-            lm = hand_lms.landmark
+        if detection is not None:
+            lm, label = detection
+            # Read the landmarks once; everything below indexes this array
+            # (or, for single coordinates, its plain-float copy - much cheaper
+            # than indexing numpy scalars)
+            pts = self.landmarks_to_array(lm, self._lm_buf)
+            self._last_pts = pts
+            xy = pts[:, :2].tolist()
             
-            # Determine palm facing and get normal for visualization
-            is_palm, normal = self.is_palm_facing(lm, label)
+            if NUMBA_AVAILABLE:
+                ratio, box, straightness, fingers_together, normal, is_palm = _validate_hand(
+                    pts, w, h, self.palm_sign(label), self.MAX_FINGER_GAP)
+            else:
+                # Cheapest checks first: finger straightness (the most expensive)
+                # only runs when its result can still decide the lock
+                is_palm, normal = self.is_palm_facing(pts, label)
+                ratio, box = self.calculate_aspect_ratio(pts, w, h)
+                fingers_together = self.check_fingers_together(pts)
+                if fingers_together and (not is_palm or ratio > Config.MIN_ASPECT_RATIO):
+                    straightness = self.calculate_finger_straightness(pts)
+                else:
+                    straightness = 0.0  # Neither palm nor nails can lock
             nx, ny, nz = normal
-            straightness = self.calculate_finger_straightness(lm)
-            fingers_together = self.check_fingers_together(lm)
-            ratio, box = self.calculate_aspect_ratio(lm, w, h)
             is_tall_enough = ratio > Config.MIN_ASPECT_RATIO
 
             # Draw palm normal arrow and nz value for debugging
-            wrist_x = int(lm[0].x * w)
-            wrist_y = int(lm[0].y * h)
+            wrist_x = int(xy[0][0] * w)
+            wrist_y = int(xy[0][1] * h)
             # Project normal to 2D (flip y because image coords)
             arrow_end = (wrist_x + int(nx * 200), wrist_y - int(ny * 200))
             color = (0, 255, 0) if is_palm else (0, 0, 255)
-            cv2.arrowedLine(img, (wrist_x, wrist_y), arrow_end, color, 2, tipLength=0.3)
-            cv2.putText(img, f"nz={nz:.3f}", (wrist_x + 8, wrist_y - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+            if draw:
+                cv2.arrowedLine(img, (wrist_x, wrist_y), arrow_end, color, 2, tipLength=0.3)
+                cv2.putText(img, f"nz={nz:.3f}", (wrist_x + 8, wrist_y - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
 
             # Compute wrist->middle_tip direction for visualization
-            mid_tip = lm[12]
-            dx = mid_tip.x - lm[0].x
-            dy = mid_tip.y - lm[0].y
+            dx = xy[12][0] - xy[0][0]
+            dy = xy[12][1] - xy[0][1]
 
             # Handle nails (back-of-hand) detection - accept any rotation IF fingers straight and together
             nails_locked = False
             nails_state = 'NAILS'
             if not is_palm and straightness > Config.OPENNESS_THRESHOLD and fingers_together:
                 nails_locked = True
-                cv2.putText(img, nails_state, (wrist_x + 8, wrist_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 0), 2)
+                if draw:
+                    cv2.putText(img, nails_state, (wrist_x + 8, wrist_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 0), 2)
 
             # For palm-facing, accept any rotation (360°) IF palm faces, hand open, fingers straight AND together
             palm_locked = False
             palm_state = 'PALM'
             if is_palm and is_tall_enough and straightness > Config.OPENNESS_THRESHOLD and fingers_together:
                 palm_locked = True
-                cv2.putText(img, palm_state, (wrist_x + 8, wrist_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 240, 160), 2)
+                if draw:
+                    cv2.putText(img, palm_state, (wrist_x + 8, wrist_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 240, 160), 2)
 
             # Final acceptance: either palm or nails at any rotation, but only when fingers straight and together
             if palm_locked or nails_locked:
                 locked = True
                 status_msg = f"LOCKED"
                 if nails_locked:
-                    raw_hand_cx = int((lm[0].x + lm[12].x) / 2 * w)
-                    raw_hand_cy = int((lm[0].y + lm[12].y) / 2 * h)
+                    raw_hand_cx = int((xy[0][0] + xy[12][0]) / 2 * w)
+                    raw_hand_cy = int((xy[0][1] + xy[12][1]) / 2 * h)
                 else:
-                    raw_hand_cx = int(lm[9].x * w)
-                    raw_hand_cy = int(lm[9].y * h)
+                    raw_hand_cx = int(xy[9][0] * w)
+                    raw_hand_cy = int(xy[9][1] * h)
                 
                 # Apply low-pass filter to smooth hand position (reduces jitter)
                 if self.smoothed_hand_x is None:
@@ -1068,22 +1712,147 @@ class VisionSystem:
                 self.current_tilt = max(Config.TILT_MIN, min(Config.TILT_MAX, self.current_tilt))
                 
                 # Draw tracking visualization
-                # Green line from center to hand
-                cv2.line(img, (center_x, center_y), (hand_cx, hand_cy), (0, 255, 0), 2)
-                # Target crosshair at center
-                cv2.drawMarker(img, (center_x, center_y), (0, 255, 255), cv2.MARKER_CROSS, 20, 2)
-                # Hand position marker
-                cv2.circle(img, (hand_cx, hand_cy), 10, (0, 255, 0), cv2.FILLED)
-                # Error text
-                cv2.putText(img, f"err:({error_x},{error_y})", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+                if draw:
+                    # Green line from center to hand
+                    cv2.line(img, (center_x, center_y), (hand_cx, hand_cy), (0, 255, 0), 2)
+                    # Target crosshair at center
+                    cv2.drawMarker(img, (center_x, center_y), (0, 255, 255), cv2.MARKER_CROSS, 20, 2)
+                    # Hand position marker
+                    cv2.circle(img, (hand_cx, hand_cy), 10, (0, 255, 0), cv2.FILLED)
+                    # Error text
+                    cv2.putText(img, f"err:({error_x},{error_y})", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
             
-            self.mp_draw.draw_landmarks(img, hand_lms, self.mp_hands.HAND_CONNECTIONS)
+            if draw and self.show_landmarks:
+                self.draw_landmarks(img, pts)
         
-        return locked, int(self.current_pan), int(self.current_tilt), box, status_msg
+        self._last_output = (locked, int(self.current_pan), int(self.current_tilt), box, status_msg)
+        return self._last_output
+
+
+# ============== VISION PIPELINE ==============
+class VisionPipeline:
+    """
+    Runs camera capture and hand inference on background threads.
+
+    Capture thread:   camera.read() + mirror flip -> frame queue
+    Inference thread: vision.process()             -> result queue
+    Main thread:      state machine, servo commands, overlays, imshow
+
+    Only every render_every-th frame is marked for display (0 = never); the
+    others skip all overlay drawing.
+
+    The frame slot holds a single frame that each new capture replaces, so
+    inference always starts on the newest frame; the result queue is bounded
+    and drops its oldest entry when full. Throughput becomes
+    max(capture, inference, render) instead of their sum.
+    """
+    MAX_FAIL_FRAMES = 30  # Tolerate some dropped frames before warning
+
+    def __init__(self, camera, vision, queue_size=Config.PIPELINE_QUEUE_SIZE,
+                 render_every=Config.RENDER_EVERY_N):
+        self.camera = camera
+        self.vision = vision
+        self.render_every = render_every
+        self._frame_idx = 0
+        # 8x8 grayscale thumbnail and result of the last frame where a fresh
+        # detection found no hand, and how many frames have reused it since
+        self._last_fp = None
+        self._last_result = None
+        self._static_skips = 0
+        self._frames = queue.Queue(maxsize=1)  # Newest frame only
+        self._results = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the capture and inference threads."""
+        for target, name in ((self._capture_loop, "lumina-capture"),
+                             (self._inference_loop, "lumina-inference")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @staticmethod
+    def _put_latest(q, item):
+        """Put item on a bounded queue, discarding the oldest entry if full."""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _capture_loop(self):
+        fail_count = 0
+        while not self._stop_event.is_set():
+            # Decode every frame even while inference is busy: the new frame
+            # evicts the waiting one, so the camera buffer never backs up and
+            # inference never starts on a stale frame
+            success, img = self.camera.read()
+            if not success:
+                fail_count += 1
+                if fail_count > self.MAX_FAIL_FRAMES:
+                    print(f"⚠️ Camera stream stalled ({fail_count} failed reads)")
+                    fail_count = 0  # Reset and keep trying
+                # Small delay to avoid CPU spin when no frames
+                time.sleep(0.01)
+                continue
+
+            fail_count = 0  # Reset on success
+            # Mirror in place - the decoded frame is ours, no second buffer needed
+            cv2.flip(img, 1, dst=img)
+            self._put_latest(self._frames, img)
+
+    def _inference_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                img = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._frame_idx += 1
+            render = self.render_every > 0 and self._frame_idx % self.render_every == 0
+            fp = cv2.cvtColor(cv2.resize(img, (8, 8), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+            last = self._last_result
+            if (last is not None and self._static_skips < Config.STATIC_FRAME_MAX_SKIP
+                    and cv2.absdiff(fp, self._last_fp).max() <= Config.STATIC_FRAME_THRESHOLD):
+                # Static scene with no hand in it: nothing for MediaPipe to find
+                result = last
+                self._static_skips += 1
+            else:
+                result = self.vision.process(img, draw=render)
+                self._static_skips = 0
+                # Only a fresh "no hand" result may be reused - a stale async or
+                # tracking-skipped output says nothing about this frame
+                if self.vision.last_detection_fresh and not result[0] and result[3] == (0, 0, 0, 0):
+                    self._last_fp = fp
+                    self._last_result = result
+                else:
+                    self._last_result = None
+            self._put_latest(self._results, (img, render) + result)
+
+    def get(self, timeout=0.1):
+        """Return the next (img, render, locked, pan, tilt, box, status_msg), or None if no frame is ready."""
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """Stop both threads and wait for them to exit."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
 
 
 # ============== WAKE WORD DETECTOR ==============
 class WakeWordDetector:
+    # All wake words in one case-folded pattern - a single scan per recognized phrase
+    WAKE_RE = re.compile("|".join(re.escape(w.casefold()) for w in Config.WAKE_WORDS))
+    
     def __init__(self, callback):
         self.callback = callback
         self.recognizer = sr.Recognizer()
@@ -1091,6 +1860,68 @@ class WakeWordDetector:
         self.running = False
         self._stop_listening = None
         self._calibrated = False
+        # Captured phrases waiting for recognition - the worker thread does the
+        # (possibly network) recognition so the listener thread keeps capturing
+        self._audio_q = queue.Queue(maxsize=2)
+        self._worker = None
+        self._vosk_model = None
+        # Restrict decoding to the wake phrases; "[unk]" absorbs everything else
+        self._vosk_grammar = json.dumps(Config.WAKE_VOSK_PHRASES + ["[unk]"])
+        if Config.WAKE_VOSK_MODEL:
+            if not VOSK_AVAILABLE:
+                print("⚠️ WAKE_VOSK_MODEL set but vosk not installed - using Google Speech")
+            else:
+                try:
+                    self._vosk_model = VoskModel(Config.WAKE_VOSK_MODEL)
+                    print("👂 Wake words recognized on-device (Vosk)")
+                except Exception as e:
+                    print(f"⚠️ Vosk model load failed: {e} - using Google Speech")
+    
+    def _recognize_vosk(self, audio) -> str:
+        """Match one captured phrase locally against WAKE_VOSK_PHRASES; returns
+        the phrase heard, or "" for anything else."""
+        rec = KaldiRecognizer(self._vosk_model, 16000, self._vosk_grammar)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        text = json.loads(rec.FinalResult()).get("text", "")
+        return text if text in Config.WAKE_VOSK_PHRASES else ""
+    
+    def _recognize_google(self, audio) -> str:
+        """Transcribe one captured phrase with Google Speech (network round-trip)."""
+        try:
+            return self.recognizer.recognize_google(audio, language=Config.WAKE_LANGUAGE)
+        except sr.UnknownValueError:
+            if not Config.WAKE_FALLBACK_LANGUAGE:
+                raise
+            return self.recognizer.recognize_google(audio, language=Config.WAKE_FALLBACK_LANGUAGE)
+    
+    def _recognize_loop(self):
+        """Worker: recognize queued phrases and fire the callback on a wake word."""
+        while True:
+            audio = self._audio_q.get()
+            if audio is None:
+                return  # cleanup()
+            if not self.running:
+                continue
+            try:
+                if self._vosk_model is not None:
+                    # Grammar-restricted: anything it returns is a wake phrase
+                    text = self._recognize_vosk(audio)
+                    if not text:
+                        continue
+                    is_wake = True
+                else:
+                    text = self._recognize_google(audio)
+                    is_wake = self.WAKE_RE.search(text.casefold()) is not None
+                print(f"🔊 Heard: {text}")
+                
+                # Check for wake word
+                if self.running and is_wake:
+                    print(f"✨ Wake word detected!")
+                    self.callback()
+            except sr.UnknownValueError:
+                pass
+            except Exception as e:
+                pass
     
     def start(self):
         if not SR_AVAILABLE:
@@ -1112,24 +1943,17 @@ class WakeWordDetector:
             except Exception as e:
                 print(f"⚠️ Microphone calibration failed: {e}")
         
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._recognize_loop, daemon=True, name="lumina-wake")
+            self._worker.start()
+        
         def audio_callback(recognizer, audio):
             if not self.running:
                 return
             try:
-                text = recognizer.recognize_google(audio, language="si-LK,en-US")
-                text_lower = text.lower()
-                print(f"🔊 Heard: {text}")
-                
-                # Check for wake word
-                for wake_word in Config.WAKE_WORDS:
-                    if wake_word.lower() in text_lower:
-                        print(f"✨ Wake word detected!")
-                        self.callback()
-                        return
-            except sr.UnknownValueError:
-                pass
-            except Exception as e:
-                pass
+                self._audio_q.put_nowait(audio)
+            except queue.Full:
+                pass  # Recognizer still busy with earlier phrases - drop this one
         
         self._stop_listening = self.recognizer.listen_in_background(
             self.microphone, audio_callback, phrase_time_limit=5
@@ -1160,14 +1984,173 @@ class WakeWordDetector:
             except Exception:
                 pass
             self._stop_listening = None
+        if self._worker:
+            # Unblock the worker; a recognition in flight is left to time out
+            while True:
+                try:
+                    self._audio_q.get_nowait()
+                except queue.Empty:
+                    break
+            self._audio_q.put(None)
+            self._worker.join(timeout=1.0)
+            self._worker = None
 
 
 # ============== GEMINI LIVE API CONVERSATION ==============
+def run_session(coro):
+    """asyncio.run() for the Live session, on a uvloop loop when available.
+    Only this call's loop is affected - the global event loop policy is left alone."""
+    if UVLOOP_AVAILABLE and hasattr(asyncio, "Runner"):  # Runner: Python 3.11+
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    return asyncio.run(coro)
+
+
+_PYAUDIO = None
+
+
+def get_pyaudio():
+    """Process-wide PyAudio instance, shared by every conversation (PortAudio
+    init enumerates all devices, so it is only done once)."""
+    global _PYAUDIO
+    if _PYAUDIO is None:
+        _PYAUDIO = pyaudio.PyAudio()
+    return _PYAUDIO
+
+
+class PCMRingBuffer:
+    """Fixed-size byte ring shared by the event loop (writer) and the
+    PortAudio callback thread (reader)."""
+    
+    def __init__(self, capacity: int):
+        self._buf = bytearray(capacity)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def free(self) -> int:
+        return self._capacity - self._size
+    
+    def write(self, data) -> int:
+        """Append as much of data as fits; returns the number of bytes written."""
+        with self._lock:
+            n = min(len(data), self._capacity - self._size)
+            end = (self._start + self._size) % self._capacity
+            first = min(n, self._capacity - end)
+            self._buf[end:end + first] = data[:first]
+            self._buf[:n - first] = data[first:n]
+            self._size += n
+            return n
+    
+    def read(self, n: int) -> bytes:
+        """Pop n bytes, padding with silence if fewer are buffered."""
+        with self._lock:
+            avail = min(n, self._size)
+            first = min(avail, self._capacity - self._start)
+            out = self._buf[self._start:self._start + first] + self._buf[:avail - first]
+            self._start = (self._start + avail) % self._capacity
+            self._size -= avail
+        if avail < n:
+            out += bytes(n - avail)
+        return bytes(out)
+    
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._size = 0
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler (int16 PCM) with a Kaiser-windowed
+    low-pass FIR designed once. Keeps filter history between chunks, so
+    consecutive chunks resample as one continuous signal."""
+    
+    def __init__(self, in_rate: int, out_rate: int, num_taps: int = 48, beta: float = 8.0):
+        g = math.gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        # Low-pass at the upsampled rate, cut just below the lower Nyquist
+        fs = in_rate * self.up
+        cutoff = 0.47 * min(in_rate, out_rate) / fs * 2
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        taps = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, beta)
+        taps *= self.up / taps.sum()  # Unity gain after zero-stuffing
+        # Phase p filters input samples for upsampled positions j % up == p
+        phase_len = -(-num_taps // self.up)
+        taps = np.concatenate([taps, np.zeros(phase_len * self.up - num_taps)])
+        self._phases = taps.reshape(phase_len, self.up).T.copy()
+        self.reset()
+    
+    def reset(self):
+        self._history = np.zeros(self._phases.shape[1] - 1)
+        self._offset = 0  # Next output's position (upsampled units) from the chunk start
+    
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample one chunk of int16 samples; returns int16 output."""
+        n = len(samples)
+        x = np.concatenate([self._history, samples])
+        # filtered[p, i] = output value at upsampled position i * up + p
+        filtered = np.stack([np.convolve(x, h, mode='valid') for h in self._phases])
+        positions = np.arange(self._offset, n * self.up, self.down)
+        out = filtered[positions % self.up, positions // self.up]
+        self._offset = (positions[-1] + self.down if len(positions) else self._offset) - n * self.up
+        self._history = x[len(x) - len(self._history):]
+        return np.clip(np.rint(out), -32768, 32767).astype('<i2')
+
+
+class PlaybackQueue(asyncio.Queue):
+    """asyncio.Queue whose pending items can be dropped in one step on barge-in."""
+    
+    def clear(self) -> int:
+        """Drop every queued item; returns how many were dropped."""
+        dropped = len(self._queue)
+        self._queue.clear()  # Underlying deque - O(1) versus get_nowait() per item
+        return dropped
+
+
 class LiveConversation:
     """
     Handles Gemini Live API bidirectional voice conversation.
     Supports both Mac audio (default) and ESP32 audio (via UDP).
     """
+    AUDIO_MIME_TYPE = "audio/pcm"
+    
+    # Light/face command tags embedded in Gemini's streamed text - one scan
+    # finds every tag, then each value is checked against its kind's format
+    TAG_RE = re.compile(r'\[(BRIGHTNESS|COLOR|AMBIENT|EFFECT|LIGHT|FACE|EMOTION|DISPLAY):([^\[\]]+)\]',
+                        re.IGNORECASE)
+    TAG_VALUE_RES = {
+        'BRIGHTNESS': re.compile(r'\d+'),
+        'COLOR': re.compile(r'[\w,]+'),          # name or R,G,B
+        'AMBIENT': re.compile(r'\w+'),
+        'EFFECT': re.compile(r'\w+'),
+        'LIGHT': re.compile(r'ON|OFF', re.IGNORECASE),
+        'FACE': re.compile(r'\w+'),              # [EMOTION:...] is an alias
+        'DISPLAY': re.compile(r'.+', re.DOTALL),
+    }
+    
+    AMBIENT_PRESETS = {
+        'focus': (100, 'cool'),        # Bright cool white for focus
+        'relax': (40, 'warm'),         # Dim warm for relaxation
+        'energize': (100, 'cyan'),     # Bright cyan for energy
+        'sleep': (10, 'warm'),         # Very dim warm for sleep mode
+        'reading': (80, 'white'),      # Good reading light
+        'movie': (20, 'warm'),         # Dim ambient for movies
+        'romantic': (30, 'pink'),      # Soft pink mood
+        'party': (100, 'purple'),      # Bright party color
+    }
+    
+    # Keyword groups for _auto_detect_emotion()
+    SAD_KEYWORDS = ('sorry', 'sad', 'unfortunately', 'regret', 'apologize', 'condolence', 'sympathy', 'sorrow', '😢', '😭')
+    NEG_WORDS = ('not', 'no', 'never', "can't", "cannot", "don't", "didn't", "won't", 'unable', 'fail')
+    LOVE_KEYWORDS = ('love', 'adore', '❤', '💕', 'heart', 'sweet')
+    HAPPY_KEYWORDS = ('happy', 'glad', 'great', 'wonderful', 'excellent', 'fantastic', 'amazing', 'haha', 'laugh', '😊', '😄')
+    # All groups in one alternation - a single scan tallies every group
+    EMOTION_RE = re.compile("|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, words))})"
+        for name, words in (("SAD", SAD_KEYWORDS), ("NEG", NEG_WORDS),
+                            ("LOVE", LOVE_KEYWORDS), ("HAPPY", HAPPY_KEYWORDS))
+    ))
     
     def __init__(self, robot_controller, use_esp32_audio=False):
         self.robot = robot_controller
@@ -1175,6 +2158,9 @@ class LiveConversation:
         self.client = None
         self.session = None
         self.use_esp32_audio = use_esp32_audio
+        # Session event loop and the event stop() sets on it (created per session)
+        self._loop = None
+        self._stopped = None
         
         if not LIVE_AVAILABLE:
             raise RuntimeError("google-genai not installed. Run: pip install google-genai")
@@ -1189,22 +2175,46 @@ class LiveConversation:
         self.client = genai.Client(api_key=api_key, http_options={'api_version': 'v1alpha'})
         
         # Audio setup for Mac
-        self.pya = pyaudio.PyAudio()
+        self.pya = get_pyaudio()
         self.mic_stream = None
         self.speaker_stream = None
         
         # UDP sockets for ESP32 audio
         self.esp32_mic_socket = None   # Receive mic audio from ESP32
         self.esp32_speaker_socket = None  # Send speaker audio to ESP32
+        self._esp32_tx_q = None  # Resampled audio waiting for the ESP32 sender thread
         
         # Queues for async audio
         self.audio_in_queue = None  # Audio from Gemini to play
-        self.audio_out_queue = None  # Audio from mic to send
+        self.audio_out_queue = None  # Raw PCM chunks from mic to send
+        # Mac playback: PCM drained by the PortAudio output callback (~0.25 s)
+        self._playback_ring = PCMRingBuffer(Config.RECEIVE_SAMPLE_RATE // 2)
+        # ESP32 playback: the body's speaker runs at 16 kHz
+        self._esp32_resampler = PolyphaseResampler(Config.RECEIVE_SAMPLE_RATE, 16000)
+        
+        # Streamed model text not yet parsed (waiting for a sentence end or "]")
+        self._text_buf = ""
+    
+    def _on_mic_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback (runs on PortAudio's thread): hand the chunk to the event loop."""
+        try:
+            self._loop.call_soon_threadsafe(self._queue_mic_chunk, in_data)
+        except RuntimeError:
+            return (None, pyaudio.paComplete)  # Event loop already closed
+        return (None, pyaudio.paContinue)
+    
+    def _queue_mic_chunk(self, audio_data):
+        """Queue a mic chunk, dropping the oldest if sending has fallen behind."""
+        if self.audio_out_queue.full():
+            self.audio_out_queue.get_nowait()
+        self.audio_out_queue.put_nowait(audio_data)
     
     async def _listen_audio_mac(self):
         """Capture audio from Mac microphone."""
         try:
             mic_info = self.pya.get_default_input_device_info()
+            # Callback mode: PortAudio delivers each chunk from its own audio
+            # thread, no blocking read() hopping through the thread pool
             self.mic_stream = await asyncio.to_thread(
                 self.pya.open,
                 format=pyaudio.paInt16,
@@ -1212,19 +2222,13 @@ class LiveConversation:
                 rate=Config.SEND_SAMPLE_RATE,
                 input=True,
                 input_device_index=mic_info["index"],
-                frames_per_buffer=Config.CHUNK_SIZE
+                frames_per_buffer=Config.CHUNK_SIZE,
+                stream_callback=self._on_mic_audio
             )
             
             print(f"🎤 Mac Mic: {mic_info['name']}")
             
-            while self.running:
-                audio_data = await asyncio.to_thread(
-                    self.mic_stream.read, Config.CHUNK_SIZE, False
-                )
-                await self.audio_out_queue.put({
-                    "data": audio_data,
-                    "mime_type": "audio/pcm"
-                })
+            await self._stopped.wait()
                 
         except Exception as e:
             print(f"❌ Mac mic error: {e}")
@@ -1247,10 +2251,7 @@ class LiveConversation:
                 try:
                     audio_data, addr = self.esp32_mic_socket.recvfrom(2048)
                     if audio_data:
-                        await self.audio_out_queue.put({
-                            "data": audio_data,
-                            "mime_type": "audio/pcm"
-                        })
+                        await self.audio_out_queue.put(audio_data)
                 except socket.timeout:
                     await asyncio.sleep(0.001)
                 except BlockingIOError:
@@ -1269,8 +2270,10 @@ class LiveConversation:
         """Send queued audio to Gemini Live."""
         while self.running:
             try:
-                audio_msg = await self.audio_out_queue.get()
-                await self.session.send_realtime_input(audio=audio_msg)
+                audio_data = await self.audio_out_queue.get()
+                await self.session.send_realtime_input(
+                    audio=types.Blob(data=audio_data, mime_type=self.AUDIO_MIME_TYPE)
+                )
             except Exception as e:
                 if self.running:
                     print(f"❌ Send error: {e}")
@@ -1285,25 +2288,36 @@ class LiveConversation:
                     if not self.running:
                         break
                     
-                    # Handle audio data
-                    if response.data:
-                        self.audio_in_queue.put_nowait(response.data)
-                        # Tell robot we're speaking - ONLY if state changed
-                        if self.robot and not is_ai_talking:
-                            self.robot.talk_start()
-                            is_ai_talking = True
+                    content = response.server_content
+                    if not content:
                         continue
-                    
-                    # Handle server content (text from native audio model)
-                    if response.server_content:
-                        if response.server_content.model_turn:
-                            for part in response.server_content.model_turn.parts:
-                                if part.text:
-                                    print(f"🤖 {part.text}")
-                                    # Parse for light control commands
-                                    self._parse_light_commands(part.text)
+                    if content.interrupted:
+                        # User barged in - drop queued speech and any unparsed
+                        # text (half a sentence or tag) from the abandoned reply
+                        self._flush_playback()
+                        self._text_buf = ""
+                    model_turn = content.model_turn
+                    if not model_turn or not model_turn.parts:
+                        continue
+                    # One pass over the parts. response.data would walk them
+                    # again, model_dump()-ing every part, on each access.
+                    for part in model_turn.parts:
+                        inline = part.inline_data
+                        if inline is not None and inline.data:
+                            # Handle audio data
+                            self.audio_in_queue.put_nowait(inline.data)
+                            # Tell robot we're speaking - ONLY if state changed
+                            if self.robot and not is_ai_talking:
+                                self.robot.talk_start()
+                                is_ai_talking = True
+                        text = part.text
+                        if text:
+                            # Echo and parse for light control commands once complete
+                            self._text_buf += text
+                            self._consume_text()
                 
                 # Turn complete
+                self._consume_text(final=True)
                 # Wait for audio queue to be drained before stopping talking animation
                 while not self.audio_in_queue.empty():
                     await asyncio.sleep(0.1)  # Checking more frequently for smoother transition
@@ -1318,22 +2332,51 @@ class LiveConversation:
             if self.running:
                 print(f"❌ Receive error: {e}")
     
+    def _flush_playback(self):
+        """Discard audio queued for playback but not yet played."""
+        self._playback_ring.clear()
+        dropped = self.audio_in_queue.clear()
+        if self._esp32_tx_q is not None:
+            # Resampled audio the ESP32 sender thread hasn't sent yet
+            with self._esp32_tx_q.mutex:
+                pending = self._esp32_tx_q.queue
+                stopping = any(item is None for item in pending)
+                pending.clear()
+                if stopping:
+                    pending.append(None)  # Keep the sender's stop signal
+        if dropped:
+            print(f"✋ Interrupted - dropped {dropped} queued audio chunks")
+    
+    def _on_speaker_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback (runs on PortAudio's thread): pull the next block from the ring."""
+        return (self._playback_ring.read(frame_count * 2 * Config.CHANNELS), pyaudio.paContinue)
+    
     async def _play_audio_mac(self):
         """Play audio from Gemini through Mac speakers."""
         try:
+            self._playback_ring.clear()
+            # Callback mode: PortAudio pulls from the ring on its own thread,
+            # so queued chunks are copied in without a to_thread hop each
             self.speaker_stream = await asyncio.to_thread(
                 self.pya.open,
                 format=pyaudio.paInt16,
                 channels=Config.CHANNELS,
                 rate=Config.RECEIVE_SAMPLE_RATE,
-                output=True
+                output=True,
+                frames_per_buffer=Config.CHUNK_SIZE,
+                stream_callback=self._on_speaker_audio
             )
             
             print("🔊 Mac Speaker active")
             
+            # Half a callback block of playback time - how long to wait for ring space
+            wait = Config.CHUNK_SIZE / Config.RECEIVE_SAMPLE_RATE / 2
             while self.running:
-                audio_bytes = await self.audio_in_queue.get()
-                await asyncio.to_thread(self.speaker_stream.write, audio_bytes)
+                audio_bytes = memoryview(await self.audio_in_queue.get())
+                while audio_bytes:
+                    audio_bytes = audio_bytes[self._playback_ring.write(audio_bytes):]
+                    if audio_bytes:
+                        await asyncio.sleep(wait)
                 
         except Exception as e:
             if self.running:
@@ -1349,8 +2392,32 @@ class LiveConversation:
                 except Exception:
                     pass  # Ignore errors during cleanup
     
+    # Largest speaker datagram (UDP has size limits)
+    ESP32_AUDIO_DATAGRAM = 1024
+    
+    def _esp32_send_loop(self, sock, tx_q):
+        """Sender thread: split resampled chunks into datagrams until a None
+        arrives, then close the socket (the thread owns it)."""
+        size = self.ESP32_AUDIO_DATAGRAM
+        try:
+            while True:
+                data = tx_q.get()
+                if data is None:
+                    return
+                view = memoryview(data)
+                for i in range(0, len(view), size):
+                    try:
+                        sock.send(view[i:i + size])
+                    except OSError:
+                        pass
+                # Pace the sending to avoid buffer overflow - ~1 ms per datagram, once per chunk
+                time.sleep(0.001 * -(-len(view) // size))
+        finally:
+            sock.close()
+    
     async def _play_audio_esp32(self):
         """Send audio from Gemini to ESP32 speaker via UDP."""
+        tx_q = None
         try:
             self.esp32_speaker_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             
@@ -1358,63 +2425,78 @@ class LiveConversation:
             esp32_ip = self.robot.body_ip if self.robot and self.robot.body_ip else Config.BODY_IP
             
             print(f"🔊 ESP32 Speaker: sending to {esp32_ip}:{Config.AUDIO_OUT_PORT}")
+            self.esp32_speaker_socket.connect((esp32_ip, Config.AUDIO_OUT_PORT))
+            
+            # Sending happens on its own thread so datagram pacing never wakes the event loop
+            tx_q = self._esp32_tx_q = queue.Queue()
+            threading.Thread(target=self._esp32_send_loop, args=(self.esp32_speaker_socket, tx_q),
+                             name="lumina-esp32-speaker", daemon=True).start()
             
             # ESP32 uses 16kHz, Gemini sends at 24kHz - need to resample
-            esp32_sample_rate = 16000
-            resample_ratio = esp32_sample_rate / Config.RECEIVE_SAMPLE_RATE  # 16000/24000 = 0.666
+            self._esp32_resampler.reset()
             
             while self.running:
                 audio_bytes = await self.audio_in_queue.get()
                 
-                # Resample audio from 24kHz to 16kHz using linear interpolation
-                import struct
-                samples = struct.unpack(f'<{len(audio_bytes)//2}h', audio_bytes)
-                
-                # Simple decimation with linear interpolation
-                new_length = int(len(samples) * resample_ratio)
-                resampled = []
-                for i in range(new_length):
-                    src_index = i / resample_ratio
-                    idx0 = int(src_index)
-                    idx1 = min(idx0 + 1, len(samples) - 1)
-                    frac = src_index - idx0
-                    value = int(samples[idx0] * (1 - frac) + samples[idx1] * frac)
-                    resampled.append(value)
-                
-                resampled_bytes = struct.pack(f'<{len(resampled)}h', *resampled)
-                
-                # Send audio in chunks (UDP has size limits)
-                chunk_size = 1024
-                for i in range(0, len(resampled_bytes), chunk_size):
-                    chunk = resampled_bytes[i:i+chunk_size]
-                    try:
-                        self.esp32_speaker_socket.sendto(chunk, (esp32_ip, Config.AUDIO_OUT_PORT))
-                        await asyncio.sleep(0.001)  # Pace the sending to avoid buffer overflow
-                    except Exception:
-                        pass
+                samples = np.frombuffer(audio_bytes, dtype='<i2', count=len(audio_bytes) // 2)
+                tx_q.put(self._esp32_resampler.process(samples).tobytes())
                 
         except Exception as e:
             if self.running:
                 print(f"❌ ESP32 speaker error: {e}")
         finally:
-            if self.esp32_speaker_socket:
+            if tx_q is not None:
+                # The sender thread closes the socket once everything queued is sent
+                self._esp32_tx_q = None
+                tx_q.put(None)
+            elif self.esp32_speaker_socket:
                 self.esp32_speaker_socket.close()
+            self.esp32_speaker_socket = None
+    
+    # Flush the text buffer regardless of boundaries once it grows this long
+    MAX_TEXT_BUF = 512
+    
+    def _consume_text(self, final=False):
+        """Echo and parse buffered text up to the last sentence end or closing "]".
+        Text after an unclosed "[" is held back so a tag is never split."""
+        buf = self._text_buf
+        if final or len(buf) > self.MAX_TEXT_BUF:
+            end = len(buf)
+        else:
+            end = max(buf.rfind("."), buf.rfind("!"), buf.rfind("?"), buf.rfind("\n"), buf.rfind("]")) + 1
+            open_tag = buf.rfind("[")
+            if open_tag > buf.rfind("]"):
+                end = min(end, open_tag)
+        if end <= 0:
+            return
+        self._text_buf = buf[end:]
+        text = buf[:end]
+        if text.strip():
+            print(f"🤖 {text.strip()}")
+        self._parse_light_commands(text)
     
     def _parse_light_commands(self, text: str):
         """Parse and execute light control commands from Gemini's response."""
         if not self.robot:
             return
-            
+        
+        # First well-formed tag of each kind; applied below in a fixed order
+        tags = {}
+        for match in self.TAG_RE.finditer(text):
+            kind, value = match.group(1).upper(), match.group(2)
+            if kind == 'EMOTION':
+                kind = 'FACE'
+            if kind not in tags and self.TAG_VALUE_RES[kind].fullmatch(value):
+                tags[kind] = value
+        
         # Brightness command: [BRIGHTNESS:50]
-        brightness_match = re.search(r'\[BRIGHTNESS:(\d+)\]', text, re.IGNORECASE)
-        if brightness_match:
-            level = int(brightness_match.group(1))
+        if 'BRIGHTNESS' in tags:
+            level = int(tags['BRIGHTNESS'])
             self.robot.set_brightness(level)
         
         # Color command: [COLOR:blue] or [COLOR:255,128,0] for RGB
-        color_match = re.search(r'\[COLOR:([\w,]+)\]', text, re.IGNORECASE)
-        if color_match:
-            color_value = color_match.group(1)
+        if 'COLOR' in tags:
+            color_value = tags['COLOR']
             # Check if it's RGB values (e.g., "255,128,0")
             if ',' in color_value:
                 try:
@@ -1426,52 +2508,37 @@ class LiveConversation:
                 self.robot.set_color_name(color_value)
         
         # Ambient presets: [AMBIENT:focus], [AMBIENT:relax], [AMBIENT:energize]
-        ambient_match = re.search(r'\[AMBIENT:(\w+)\]', text, re.IGNORECASE)
-        if ambient_match:
-            preset = ambient_match.group(1).lower()
-            presets = {
-                'focus': (100, 'cool'),        # Bright cool white for focus
-                'relax': (40, 'warm'),         # Dim warm for relaxation
-                'energize': (100, 'cyan'),     # Bright cyan for energy
-                'sleep': (10, 'warm'),         # Very dim warm for sleep mode
-                'reading': (80, 'white'),      # Good reading light
-                'movie': (20, 'warm'),         # Dim ambient for movies
-                'romantic': (30, 'pink'),      # Soft pink mood
-                'party': (100, 'purple'),      # Bright party color
-            }
-            if preset in presets:
-                brightness, color = presets[preset]
+        if 'AMBIENT' in tags:
+            preset = tags['AMBIENT'].lower()
+            if preset in self.AMBIENT_PRESETS:
+                brightness, color = self.AMBIENT_PRESETS[preset]
                 self.robot.set_brightness(brightness)
                 self.robot.set_color_name(color)
                 print(f"🌟 Ambient preset: {preset}")
         
         # Light effect: [EFFECT:pulse], [EFFECT:breathe]
-        effect_match = re.search(r'\[EFFECT:(\w+)\]', text, re.IGNORECASE)
-        if effect_match:
-            effect = effect_match.group(1).lower()
+        if 'EFFECT' in tags:
+            effect = tags['EFFECT'].lower()
             self.robot.send_command(f"EFFECT:{effect}")
             print(f"✨ Light effect: {effect}")
         
         # Turn on/off: [LIGHT:ON] or [LIGHT:OFF]
-        light_match = re.search(r'\[LIGHT:(ON|OFF)\]', text, re.IGNORECASE)
-        if light_match:
-            state = light_match.group(1).upper()
+        if 'LIGHT' in tags:
+            state = tags['LIGHT'].upper()
             if state == 'OFF':
                 self.robot.set_brightness(0)
             else:
                 self.robot.set_brightness(80)  # Default on brightness
         
         # Face/Emotion control: [FACE:happy] or [EMOTION:love]
-        face_match = re.search(r'\[(?:FACE|EMOTION):(\w+)\]', text, re.IGNORECASE)
-        if face_match:
-            emotion = face_match.group(1).lower()
+        if 'FACE' in tags:
+            emotion = tags['FACE'].lower()
             print(f"🔍 Face/Emotion command from AI: {emotion}")
             self.robot.set_emotion(emotion)
         
         # Display text on OLED: [DISPLAY:Hello!]
-        display_match = re.search(r'\[DISPLAY:([^\]]+)\]', text, re.IGNORECASE)
-        if display_match:
-            display_text = display_match.group(1)
+        if 'DISPLAY' in tags:
+            display_text = tags['DISPLAY']
             self.robot.display_text(display_text)
         
         # Auto-detect emotions from response text (subtle mood matching)
@@ -1492,21 +2559,18 @@ class LiveConversation:
         text_lower = text.lower()
         # Debug short sample
         debug_sample = text_lower.strip()[:200]
-        # Define keyword groups
-        sad_keywords = ['sorry', 'sad', 'unfortunately', 'regret', 'apologize', 'condolence', 'sympathy', 'sorrow', '😢', '😭']
-        neg_words = ['not', 'no', 'never', "can't", "cannot", "don't", "didn't", "won't", 'unable', 'fail']
-        love_keywords = ['love', 'adore', '❤', '💕', 'heart', 'sweet']
-        happy_keywords = ['happy', 'glad', 'great', 'wonderful', 'excellent', 'fantastic', 'amazing', 'haha', 'laugh', '😊', '😄']
-
-        sad_count = sum(text_lower.count(k) for k in sad_keywords)
-        neg_count = sum(text_lower.count(k) for k in neg_words)
+        counts = {"SAD": 0, "NEG": 0, "LOVE": 0, "HAPPY": 0}
+        for match in self.EMOTION_RE.finditer(text_lower):
+            counts[match.lastgroup] += 1
+        sad_count = counts["SAD"]
+        neg_count = counts["NEG"]
 
         # Determine sad only for stronger signals: at least 2 sad keywords OR 'sorry' with negative context
         if sad_count >= 2 or ('sorry' in text_lower and neg_count > 0):
             face = 'SAD'
-        elif any(k in text_lower for k in love_keywords):
+        elif counts["LOVE"]:
             face = 'LOVE'
-        elif any(k in text_lower for k in happy_keywords):
+        elif counts["HAPPY"]:
             face = 'HAPPY'
         else:
             # Nothing strong enough to change emotion
@@ -1520,6 +2584,9 @@ class LiveConversation:
     async def start_session(self):
         """Start the Live API session with audio streaming."""
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._text_buf = ""  # Leftovers from an aborted session must not leak into this one
         audio_mode = "ESP32" if self.use_esp32_audio else "Mac"
         print(f"\n🎙️  Starting Gemini Live conversation ({audio_mode} audio)...")
         
@@ -1550,7 +2617,9 @@ class LiveConversation:
                 print("✅ Connected to Gemini Live")
                 
                 # Initialize queues
-                self.audio_in_queue = asyncio.Queue()
+                # Unbounded: Gemini delivers speech faster than real time, so
+                # capping it would cut replies short - barge-in clears it instead
+                self.audio_in_queue = PlaybackQueue()
                 self.audio_out_queue = asyncio.Queue(maxsize=10)  # Moderate buffer for smooth audio
                 
                 async with asyncio.TaskGroup() as tg:
@@ -1566,8 +2635,7 @@ class LiveConversation:
                     tg.create_task(self._receive_audio())
                     
                     # Keep running until stopped
-                    while self.running:
-                        await asyncio.sleep(0.1)
+                    await self._stopped.wait()
                     
                     # Cancel all tasks when stopped
                     raise asyncio.CancelledError("User stopped conversation")
@@ -1594,8 +2662,13 @@ class LiveConversation:
             print("💬 Live session ended")
     
     def stop(self):
-        """Stop the live conversation."""
+        """Stop the live conversation (safe to call from any thread)."""
         self.running = False
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass  # Session loop already closed
     
     def cleanup(self):
         """Cleanup audio resources after conversation ends."""
@@ -1620,19 +2693,25 @@ class LiveConversation:
             except:
                 pass
             self.esp32_mic_socket = None
-        if self.esp32_speaker_socket:
+        tx_q = self._esp32_tx_q
+        if tx_q is not None:
+            # The sender thread owns the speaker socket: it closes it once it
+            # has sent what's queued
+            self._esp32_tx_q = None
+            tx_q.put(None)
+        elif self.esp32_speaker_socket:
             try:
-                self.esp32_speaker_socket.close()
+                self.esp32_speaker_socket.close()  # Sender never started
             except:
                 pass
-            self.esp32_speaker_socket = None
+        self.esp32_speaker_socket = None
         # Stop ESP32 audio streaming
         if self.use_esp32_audio and self.robot:
             self.robot.send_command("AUDIO_STOP")
 
 
 # ============== MAIN APPLICATION ==============
-def main():
+def main(display=True):
     print("=" * 55)
     print("  🔆 LUMINA - AI Robotic Lamp with Gemini Live 🔆")
     print("  📡 Split Nervous System Architecture")
@@ -1667,8 +2746,8 @@ def main():
     live_conversation = None
     live_thread = None
     state_lock = threading.Lock()  # Thread-safe state changes
-    wake_word_triggered = threading.Event()  # Signal when wake word detected
-    touch_triggered = threading.Event()  # Signal when touch sensor triggered
+    # Conversation start requests ("WAKE", "MANUAL", "TOUCH") from callbacks and keys
+    triggers = queue.SimpleQueue()
     # Debug: overlay raw face repr and byte list
     SHOW_FACE_DEBUG = False
     
@@ -1678,7 +2757,7 @@ def main():
         with state_lock:
             if current_state == State.IDLE or current_state == State.TRACKING:
                 current_state = State.LISTENING
-                wake_word_triggered.set()
+                triggers.put("WAKE")
     
     # Touch/status callback from body - DISABLED
     # def on_body_status(status: str):
@@ -1688,7 +2767,7 @@ def main():
     #         with state_lock:
     #             if current_state != State.LIVE_CHAT:
     #                 current_state = State.LISTENING
-    #                 touch_triggered.set()
+    #                 triggers.put("TOUCH")
     #                 print("👆 Touch activated - starting chat...")
     #     elif status == "MUTE":
     #         # Touch deactivated - stop chat
@@ -1704,6 +2783,8 @@ def main():
     wake_detector = WakeWordDetector(on_wake_word)
     if SR_AVAILABLE:
         wake_detector.start()
+    if LIVE_AVAILABLE and not Config.USE_ESP32_AUDIO:
+        get_pyaudio()  # Initialize PortAudio now, not when the first conversation starts
     
     print("\n🎮 Controls:")
     print("   �️  Say 'Hey Lumina' - Start live conversation")
@@ -1718,7 +2799,7 @@ def main():
         nonlocal current_state, live_conversation
         try:
             live_conversation = LiveConversation(controller, use_esp32_audio=Config.USE_ESP32_AUDIO)
-            asyncio.run(live_conversation.start_session())
+            run_session(live_conversation.start_session())
         except Exception as e:
             print(f"❌ Live error: {e}")
             import traceback
@@ -1727,28 +2808,32 @@ def main():
             current_state = State.IDLE
             # Wake detector continues running in background, no need to resume
     
-    frame_fail_count = 0
-    MAX_FAIL_FRAMES = 30  # Tolerate some dropped frames
-    
-    while camera.isOpened():
-        success, img = camera.read()
-        if not success:
-            frame_fail_count += 1
-            if frame_fail_count > MAX_FAIL_FRAMES:
-                print(f"⚠️ Camera stream stalled ({frame_fail_count} failed reads)")
-                frame_fail_count = 0  # Reset and keep trying
-            # Small delay to avoid CPU spin when no frames
-            time.sleep(0.01)
+    # Capture and hand inference run on background threads; this loop only
+    # handles state, servo commands and rendering
+    cv2.setNumThreads(1)  # Avoid oversubscribing cores alongside MediaPipe's own threads
+    pipeline = VisionPipeline(camera, vision, render_every=Config.RENDER_EVERY_N if display else 0)
+    pipeline.start()
+
+    # Ctrl+C ends the loop so cleanup still runs (the only way out with --no-display)
+    quit_requested = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: quit_requested.set())
+
+    while camera.isOpened() and not quit_requested.is_set():
+        frame = pipeline.get()
+        if frame is None:
+            # Camera/pipeline stalled - still send face/LED commands queued by
+            # the conversation thread instead of holding them until it recovers
+            controller.flush()
             continue
-        
-        frame_fail_count = 0  # Reset on success
-        img = cv2.flip(img, 1)
+
+        img, render, locked, pan, tilt, box, status_msg = frame
         h, w, _ = img.shape
         
         # Poll for status from body (disabled for now)
         # controller.receive_status()
         
-        key = cv2.waitKey(1) & 0xFF
+        # Keys are only polled on rendered frames (no window otherwise)
+        key = cv2.waitKey(1) & 0xFF if render else 0xFF
         if key == ord('q'):
             break
         if key == ord('t'):
@@ -1767,12 +2852,13 @@ def main():
         if key == ord('v') and not live_conversation:
             # Manual start (useful when no touch sensor available)
             print("\n🟢 Manual start requested (key 'v')")
-            wake_word_triggered.set()
+            triggers.put("MANUAL")
         if key == ord('e') and live_conversation:
             print("\n🛑 Ending conversation...")
             live_conversation.stop()
             live_conversation.cleanup()
-            time.sleep(0.5)  # Give PyAudio time to fully release resources
+            if live_thread:
+                live_thread.join(timeout=1.0)  # Session has released its audio streams
             # Tell body to exit chat mode
             controller.send_command("CHAT_STOP")
             with state_lock:
@@ -1780,8 +2866,14 @@ def main():
             if SR_AVAILABLE:
                 wake_detector.start()
         
-        # Check if wake word was triggered (touch disabled)
-        triggered = wake_word_triggered.is_set()
+        # Check if a conversation start was requested (touch disabled)
+        triggered = False
+        while True:
+            try:
+                triggers.get_nowait()
+            except queue.Empty:
+                break
+            triggered = True
         if triggered:
             with state_lock:
                 current_state = State.LISTENING
@@ -1794,8 +2886,6 @@ def main():
             # Stop wake detector from main thread and start live conversation
             if SR_AVAILABLE:
                 wake_detector.stop()
-            wake_word_triggered.clear()
-            # touch_triggered.clear()  # Disabled
             
             with state_lock:
                 current_state = State.LIVE_CHAT
@@ -1805,38 +2895,39 @@ def main():
             live_thread.start()
         
         elif local_state == State.LIVE_CHAT:
-            # Continue vision processing during live chat
-            locked, pan, tilt, box, status_msg = vision.process(img)
-            
+            # Vision processing continues during live chat (pipeline threads)
             # Only send move commands if hand gesture is LOCKED (proper palm gesture)
             # This prevents servo from moving randomly during conversation
             if locked:
                 controller.move(pan, tilt)
-                # Draw tracking
-                if box != (0, 0, 0, 0):
-                    cv2.rectangle(img, (box[0], box[1]), (box[2], box[3]), (0, 255, 0), 2)
             # If not locked, don't send any servo commands - servo holds last position
             
-            cv2.circle(img, (w//2, h//2), Config.DEADZONE, (255, 255, 0), 1)
-            
-            # Draw OLED simulation (face)
-            draw_oled_simulation(img, RobotController.current_face, x=10, y=70)
-            
-            # Draw LED simulation (brightness/color)
-            draw_led_simulation(img, x=10, y=175)
-            
-            # Show live chat indicator overlay
-            cv2.rectangle(img, (0, 0), (w, 60), (0, 165, 255), cv2.FILLED)
-            cv2.putText(img, "LIVE CONVERSATION" + (" | TRACKING" if locked else ""), (20, 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            cv2.putText(img, "Press 'e' to end", (20, 50),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            if render:
+                # Draw tracking
+                if locked and box != (0, 0, 0, 0):
+                    cv2.rectangle(img, (box[0], box[1]), (box[2], box[3]), (0, 255, 0), 2)
+                
+                cv2.circle(img, (w//2, h//2), Config.DEADZONE, (255, 255, 0), 1)
+                
+                # Draw OLED simulation (face)
+                draw_oled_simulation(img, RobotController.current_face, x=10, y=70)
+                
+                # Draw LED simulation (brightness/color)
+                draw_led_simulation(img, x=10, y=175)
+                
+                # Show live chat indicator overlay
+                cv2.rectangle(img, (0, 0), (w, 60), (0, 165, 255), cv2.FILLED)
+                cv2.putText(img, "LIVE CONVERSATION" + (" | TRACKING" if locked else ""), (20, 25),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                cv2.putText(img, "Press 'e' to end", (20, 50),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
             
             # Check if conversation ended
             if live_conversation and not live_conversation.running:
                 # Properly cleanup audio streams before restarting wake detector
                 live_conversation.cleanup()
-                time.sleep(0.5)  # Give PyAudio time to fully release resources
+                if live_thread:
+                    live_thread.join(timeout=1.0)  # Session has released its audio streams
                 # Tell body to exit chat mode
                 controller.send_command("CHAT_STOP")
                 with state_lock:
@@ -1846,8 +2937,6 @@ def main():
         
         else:
             # Normal vision processing (IDLE or TRACKING)
-            locked, pan, tilt, box, status_msg = vision.process(img)
-            
             if locked:
                 with state_lock:
                     current_state = State.TRACKING
@@ -1858,43 +2947,55 @@ def main():
                     current_state = State.IDLE
             
             # Draw debug
-            if box != (0, 0, 0, 0):
-                color = (0, 255, 0) if locked else (0, 0, 255)
-                cv2.rectangle(img, (box[0], box[1]), (box[2], box[3]), color, 2)
-            cv2.circle(img, (w//2, h//2), Config.DEADZONE, (255, 255, 0), 1)
-            cv2.rectangle(img, (0, 0), (w, 40), (0, 0, 0), cv2.FILLED)
-            
-            # Show connection mode and instructions
-            conn_mode = "📡 WiFi" if controller.use_network else ("🔌 USB" if controller.serial else "🖥️ Sim")
-            cv2.putText(img, f"{status_msg} | {conn_mode} | Say 'Hey Lumina' or press 'v'", (20, 28),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # State indicator
-        state_colors = {
-            State.IDLE: (128, 128, 128),
-            State.TRACKING: (0, 255, 0),
-            State.LISTENING: (255, 165, 0),
-            State.LIVE_CHAT: (0, 165, 255)
-        }
-        cv2.circle(img, (w - 25, 25), 12, state_colors.get(local_state, (255, 255, 255)), -1)
+            if render:
+                if box != (0, 0, 0, 0):
+                    color = (0, 255, 0) if locked else (0, 0, 255)
+                    cv2.rectangle(img, (box[0], box[1]), (box[2], box[3]), color, 2)
+                cv2.circle(img, (w//2, h//2), Config.DEADZONE, (255, 255, 0), 1)
+                cv2.rectangle(img, (0, 0), (w, 40), (0, 0, 0), cv2.FILLED)
+                
+                # Show connection mode and instructions
+                conn_mode = "📡 WiFi" if controller.use_network else ("🔌 USB" if controller.serial else "🖥️ Sim")
+                cv2.putText(img, f"{status_msg} | {conn_mode} | Say 'Hey Lumina' or press 'v'", (20, 28),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         
         with state_lock:
             if current_state != last_state:
                 print(f"State: {last_state} -> {current_state}")
                 last_state = current_state
+                vision.show_landmarks = current_state == State.TRACKING
+        
+        controller.flush()  # One serial write for everything sent this frame
         
-        cv2.imshow("Lumina", img)
+        if render:
+            # State indicator
+            cv2.circle(img, (w - 25, 25), 12, STATE_COLORS.get(local_state, (255, 255, 255)), -1)
+            cv2.imshow("Lumina", img)
     
     # Cleanup
     if SR_AVAILABLE:
         wake_detector.stop()
     if live_conversation:
         live_conversation.stop()
+        live_conversation.cleanup()  # Close its PyAudio streams
+    if live_thread:
+        live_thread.join(timeout=2.0)
+    pipeline.stop()
+    vision.close()
     camera.release()
-    cv2.destroyAllWindows()
+    if _PYAUDIO is not None and not (live_thread and live_thread.is_alive()):
+        # Only once no session can still be using it - terminating PortAudio
+        # under an open callback stream can crash or hang
+        _PYAUDIO.terminate()
+    if display:
+        cv2.destroyAllWindows()
     controller.close()
     print("👋 Lumina shutdown complete")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Lumina - AI robotic lamp")
+    parser.add_argument("--no-display", action="store_true",
+                        help="run headless: no OpenCV window, tracking and voice only (Ctrl+C to quit)")
+    args = parser.parse_args()
+    main(display=not args.no_display)
@@ -0,0 +1,71 @@
+import io
+
+import cv2
+import numpy as np
+import pytest
+
+import lumina_unified
+from lumina_unified import MJPEGStreamReader
+
+BOUNDARY = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+
+
+class ChunkedStream(io.BytesIO):
+    """HTTP response stand-in whose read1() returns small pieces, so JPEG
+    markers get split across reads."""
+
+    def __init__(self, data, piece):
+        super().__init__(data)
+        self.piece = piece
+
+    def read1(self, n=-1):
+        return super().read1(self.piece if n < 0 else min(n, self.piece))
+
+
+def _stream(levels):
+    parts = []
+    for level in levels:
+        ok, jpg = cv2.imencode(".jpg", np.full((16, 16, 3), level, np.uint8))
+        assert ok
+        parts.append(BOUNDARY + jpg.tobytes() + b"\r\n")
+    return b"".join(parts)
+
+
+@pytest.fixture
+def open_reader(monkeypatch):
+    """Build a reader through its constructor, served from an in-memory stream."""
+    def no_http(*args, **kwargs):
+        raise OSError("no camera in tests")
+
+    monkeypatch.setattr(lumina_unified.requests, "get", no_http)
+
+    def make(data, piece=7):
+        stream = ChunkedStream(data, piece)
+        monkeypatch.setattr(lumina_unified.urllib.request, "urlopen", lambda url, timeout: stream)
+        return MJPEGStreamReader("http://127.0.0.1:81/stream", timeout=1)
+    return make
+
+
+def test_frames_decode_in_order(open_reader):
+    levels = [i % 250 for i in range(200)]
+    reader = open_reader(_stream(levels))
+    assert reader.isOpened()
+    # The constructor grabs the first frame to verify the connection
+    ok, frame = reader.retrieve()
+    assert ok and abs(frame.mean() - levels[0]) < 3
+    for level in levels[1:]:
+        ok, frame = reader.read()
+        assert ok
+        assert abs(frame.mean() - level) < 3
+    ok, frame = reader.read()
+    assert not ok and frame is None
+    assert not reader.isOpened()  # Server closed the stream
+
+
+def test_grab_skips_without_decoding(open_reader):
+    reader = open_reader(_stream([10, 120, 240]), piece=4096)
+    assert reader.grab()  # Drop the first frame undecoded
+    ok, frame = reader.retrieve()
+    assert ok and abs(frame.mean() - 120) < 3
+    ok, frame = reader.read()
+    assert ok and abs(frame.mean() - 240) < 3